@@ -19,9 +19,12 @@
 ##########################################################################################
 
 import logging
+import contextlib
 import copy
 import os.path
 import re
+import sys
+from fractions import Fraction
 
 import numpy as np
 
@@ -39,6 +42,7 @@ class _Info():
     PARAM_TYPES = []
 
     def __init__(self):
+        self.batch_depth = 0
         self.params =   { 
                             "None": { 
                                 'value': 'None',
@@ -51,26 +55,56 @@ class _Info():
     def valid(self):
         return self.ok
 
+    @staticmethod
+    def _valid_value(value, values):
+        # parameter values are either given as list of valid values or as maximum of the range 0..values
+        if isinstance(values, list):
+            return value in values
+        else:
+            return 0 <= value <= values
+
+    @staticmethod
+    def _values_text(values):
+        if isinstance(values, list):
+            return f"{values}"
+        else:
+            return f"range 0..{values}"
+
     def _validate_params(self, params):
         ok = True
         for param_name in self.PARAM_TYPES:
-            if param_name not in params:
+            param = params.get(param_name)
+            if param is None:
                 logging.error(f"{self.__class__.__name__} parmeter {param_name} is not present")
                 ok = False
-            elif isinstance(params[param_name]['values'], list):
-                if params[param_name]['value'] not in params[param_name]['values']:
-                    logging.error(f"{self.__class__.__name__} with invalid parmeter {param_name}: {params[param_name]['value']} is not in {params[param_name]['values']}")
-                    ok = False
-            else:
-                if (params[param_name]['value'] < 0) or (params[param_name]['value'] > params[param_name]['values']):
-                    logging.error(f"{self.__class__.__name__} with invalid parmeter {param_name}: {params[param_name]['value']} is not in range 0..{params[param_name]['values']}")
-                    ok = False
+            elif not self._valid_value(param['value'], param['values']):
+                logging.error(f"{self.__class__.__name__} with invalid parmeter {param_name}: {param['value']} is not in {self._values_text(param['values'])}")
+                ok = False
         return ok
 
     def validate_params(self):
         self.ok = self._validate_params(self.params)
         return self.ok
 
+    def _params_changed(self):
+        # revalidate after a set_* call unless it is part of a batch update
+        if self.batch_depth > 0:
+            return True
+        else:
+            return self.validate_params()
+
+    @contextlib.contextmanager
+    def batch_update(self):
+        # several set_* calls in a with block are validated once when leaving it,
+        # nested blocks leave the validation to the outermost one
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.validate_params()
+
     def freeze_params(self):
         if self.ok:
             for p in self.PARAM_TYPES:
@@ -88,36 +122,34 @@ class _Info():
     def get_params(self):
         return self.ok, self.params
 
+    def clone(self):
+        # the parameter values are scalars or lists that are replaced but never altered, one dict level is enough
+        info = copy.copy(self)
+        info.batch_depth = 0
+        info.params = {param_name: param.copy() for param_name, param in self.params.items()}
+        return info
+
     def apply_params(self, params):
         if not self._validate_params(params):
             logging.error(f"{self.__class__.__name__} external parmeter set is not valid")
         else:
             for param_name in self.PARAM_TYPES:
-                apply = True
-                if not self.params[param_name]['editable']:
-                    logging.info(f"{self.__class__.__name__} parmeter {param_name} set is ediable - value not applied")
-                    apply = False
+                param = self.params[param_name]
+                value = params[param_name]['value']
+                if not param['editable']:
+                    logging.info(f"{self.__class__.__name__} parmeter {param_name} set is not ediable - value not applied")
+                elif not self._valid_value(value, param['values']):
+                    # external value is not in valid member values
+                    logging.info(f"{self.__class__.__name__} parmeter {param_name}: {value} is not in {self._values_text(param['values'])} - value not applied")
                 else:
-                    if isinstance(self.params[param_name]['values'], list):
-                        if params[param_name]['value'] not in self.params[param_name]['values']:
-                            # external value is not in valid member value list 
-                            logging.info(f"{self.__class__.__name__} parmeter {param_name}: {params[param_name]['value']} is not in {self.params[param_name]['values']} - value not applied")
-                            apply = False
-                    else:
-                        if (params[param_name]['value'] < 0) or (params[param_name]['value'] > self.params[param_name]['values']):
-                            logging.info(f"{self.__class__.__name__} parmeter {param_name}: {params[param_name]['value']} is not in range 0..{self.params[param_name]['values']} - value not applied")
-                            apply = False
-                if apply:
-                    self.params[param_name]['value'] = params[param_name]['value']
+                    param['value'] = value
 
     def set_value(self, param, value):
         if param not in self.PARAM_TYPES:
             return False
         elif not self.params[param]["editable"]:
             return False
-        elif isinstance(self.params[param]['values'], list) and value not in self.params[param]["values"]:
-            return False
-        elif not isinstance(self.params[param]['values'], list) and ((value < 0) or (value > self.params[param]["values"])):
+        elif not self._valid_value(value, self.params[param]["values"]):
             return False
         else:
             self.params[param]["value"] = value
@@ -186,6 +218,11 @@ class HImageInfo(_Info):
     COLORMODES_YUV = [COLORMODE_YUV444, COLORMODE_YUV422, COLORMODE_YUV420]
     COLORMODES = COLORMODES_MONO + COLORMODES_RGB + COLORMODES_YUV
 
+    BITDEPTHS = list(range(1, 32))
+
+    COLORMODE_COMPONENTS = { **{ colormode: 1 for colormode in COLORMODES_MONO + COLORMODES_BAYER },
+                             **{ colormode: 3 for colormode in COLORMODES_RGB + COLORMODES_YUV } }
+
     PARAM_COLORMODE = "colormode"
     PARAM_BITDEPTH = "bitdepth"
     PARAM_WIDTH = "width"
@@ -194,6 +231,7 @@ class HImageInfo(_Info):
 
     def __init__(self, colormode=COLORMODE_NONE, width=0, height=0, bitdepth=0):
         self.ok = True
+        self.batch_depth = 0
         self.params = { 
                         self.PARAM_COLORMODE: { 
                             'value': colormode,
@@ -202,7 +240,7 @@ class HImageInfo(_Info):
                         },
                         self.PARAM_BITDEPTH: { 
                             'value': bitdepth,
-                            'values': [i for i in range(1,32) ],
+                            'values': HImageInfo.BITDEPTHS,
                             'editable': True
                         },
                         self.PARAM_WIDTH: {
@@ -222,7 +260,7 @@ class HImageInfo(_Info):
         if self.params[self.PARAM_COLORMODE]["editable"]:
             if colormode in self.params[self.PARAM_COLORMODE]["values"]:
                 self.params[self.PARAM_COLORMODE]["value"] = colormode
-                return self.validate_params()
+                return self._params_changed()
         return False
 
     def get_colormode(self):
@@ -233,17 +271,7 @@ class HImageInfo(_Info):
 
     def get_components(self):
         if self.ok:
-            if ( self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_MONO or
-                self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_BAYER_RGGB or
-                self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_BAYER_GBRG or
-                self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_BAYER_BGGR or
-                self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_BAYER_GBRG ) :
-                return 1
-            if ( self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_RGB or
-                self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_YUV444 or
-                self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_YUV422 or
-                self.params[self.PARAM_COLORMODE]["value"] == HImageInfo.COLORMODE_YUV420 ) :
-                return 3
+            return HImageInfo.COLORMODE_COMPONENTS.get(self.params[self.PARAM_COLORMODE]["value"], 0)
         return 0
 
 
@@ -251,7 +279,7 @@ class HImageInfo(_Info):
         if self.params[self.PARAM_BITDEPTH]["editable"]:
             if bitdepth in self.params[self.PARAM_BITDEPTH]["values"]:
                 self.params[self.PARAM_BITDEPTH]["value"] = bitdepth
-                return self.validate_params()
+                return self._params_changed()
         return False
 
     def get_bitdepth(self):
@@ -264,7 +292,7 @@ class HImageInfo(_Info):
         if self.params[self.PARAM_WIDTH]["editable"] and self.params[self.PARAM_HEIGHT]["editable"]:
             self.params[self.PARAM_WIDTH]["value"] = width
             self.params[self.PARAM_HEIGHT]["value"] = height
-            return self.validate_params()
+            return self._params_changed()
         return False
 
     def get_size(self):
@@ -285,29 +313,10 @@ class HImageInfo(_Info):
 
     def set_colormode_from_storagemode(self, storagemode):
         if self.params[self.PARAM_COLORMODE]["editable"]:
-            if storagemode in HImageStorageInfo.STORAGE_MODES_MONO:
-                self.params[self.PARAM_COLORMODE]["value"] = HImageInfo.COLORMODE_MONO
-                self.params[self.PARAM_COLORMODE]["values"] = HImageInfo.COLORMODES_MONO + HImageInfo.COLORMODES_BAYER
-                return True
-            if storagemode in HImageStorageInfo.STORAGE_MODES_MIPI:
-                self.params[self.PARAM_COLORMODE]["value"] = HImageInfo.COLORMODE_MONO
-                self.params[self.PARAM_COLORMODE]["values"] = HImageInfo.COLORMODES_MONO + HImageInfo.COLORMODES_BAYER
-                return True
-            if storagemode in HImageStorageInfo.STORAGE_MODES_RGB:
-                self.params[self.PARAM_COLORMODE]["value"] = HImageInfo.COLORMODE_RGB
-                self.params[self.PARAM_COLORMODE]["values"] = [HImageInfo.COLORMODE_RGB]
-                return True
-            if storagemode in HImageStorageInfo.STORAGE_MODES_YUV444:
-                self.params[self.PARAM_COLORMODE]["value"] = HImageInfo.COLORMODE_YUV444
-                self.params[self.PARAM_COLORMODE]["values"] = [HImageInfo.COLORMODE_YUV444]
-                return True
-            if storagemode in HImageStorageInfo.STORAGE_MODES_YUV422:
-                self.params[self.PARAM_COLORMODE]["value"] = HImageInfo.COLORMODE_YUV422
-                self.params[self.PARAM_COLORMODE]["values"] = [HImageInfo.COLORMODE_YUV422]
-                return True
-            if storagemode in HImageStorageInfo.STORAGE_MODES_YUV420:
-                self.params[self.PARAM_COLORMODE]["value"] = HImageInfo.COLORMODE_YUV420
-                self.params[self.PARAM_COLORMODE]["values"] = [HImageInfo.COLORMODE_YUV420]
+            colormodes = HImageStorageInfo.STORAGE_MODE_COLORMODES.get(storagemode)
+            if colormodes is not None:
+                self.params[self.PARAM_COLORMODE]["value"] = colormodes[0]
+                self.params[self.PARAM_COLORMODE]["values"] = list(colormodes)
                 return True
         return False
 
@@ -346,9 +355,25 @@ class HImageStorageInfo(_Info):
     STORAGE_MODES_YUV444                 = [ STORAGE_MODE_YUV444_YUV_interleaved, STORAGE_MODE_YUV444_YUV_planar ]
     STORAGE_MODES_YUV422                 = [ STORAGE_MODE_YUV422_UYVY_interleaved, STORAGE_MODE_YUV422_VYUY_interleaved, STORAGE_MODE_YUV422_YUYV_interleaved, STORAGE_MODE_YUV422_YVYU_interleaved, STORAGE_MODE_YUV422_YUV_planar, STORAGE_MODE_YUV422_YVU_planar ]
     STORAGE_MODES_YUV420                 = [ STORAGE_MODE_YUV420_YUV_planar, STORAGE_MODE_YUV420_YVU_planar ]
-    STORAGE_MODES_PLANAR                 = STORAGE_MODES_MONO + [ STORAGE_MODE_RGB_RGB_planar, STORAGE_MODE_YUV444_YUV_planar, STORAGE_MODE_YUV422_YUV_planar, STORAGE_MODE_YUV422_YVU_planar, STORAGE_MODE_YUV420_YUV_planar, STORAGE_MODE_YUV420_YVU_planar, STORAGE_MODE_MIPI_RAW ]
-    STORAGE_MODES_INTERLEAVED            = [ STORAGE_MODE_RGB_RGB_interleaved, STORAGE_MODE_RGB_BGR_interleaved, STORAGE_MODE_YUV444_YUV_interleaved, STORAGE_MODE_YUV422_UYVY_interleaved, STORAGE_MODE_YUV422_VYUY_interleaved, STORAGE_MODE_YUV422_YUYV_interleaved, STORAGE_MODE_YUV422_YVYU_interleaved ]
+    # sample layouts are only tested for membership, never offered as param values
+    STORAGE_MODES_PLANAR                 = frozenset(STORAGE_MODES_MONO + [ STORAGE_MODE_RGB_RGB_planar, STORAGE_MODE_YUV444_YUV_planar, STORAGE_MODE_YUV422_YUV_planar, STORAGE_MODE_YUV422_YVU_planar, STORAGE_MODE_YUV420_YUV_planar, STORAGE_MODE_YUV420_YVU_planar, STORAGE_MODE_MIPI_RAW ])
+    STORAGE_MODES_INTERLEAVED            = frozenset([ STORAGE_MODE_RGB_RGB_interleaved, STORAGE_MODE_RGB_BGR_interleaved, STORAGE_MODE_YUV444_YUV_interleaved, STORAGE_MODE_YUV422_UYVY_interleaved, STORAGE_MODE_YUV422_VYUY_interleaved, STORAGE_MODE_YUV422_YUYV_interleaved, STORAGE_MODE_YUV422_YVYU_interleaved ])
     STORAGE_MODES                        = STORAGE_MODES_MONO + STORAGE_MODES_MIPI + STORAGE_MODES_RGB + STORAGE_MODES_YUV444 + STORAGE_MODES_YUV422 + STORAGE_MODES_YUV420
+    STORAGE_MODE_SAMPLES                 = { **{ mode: 1   for mode in STORAGE_MODES_MONO + STORAGE_MODES_MIPI },
+                                             **{ mode: 3   for mode in STORAGE_MODES_RGB + STORAGE_MODES_YUV444 },
+                                             **{ mode: 2   for mode in STORAGE_MODES_YUV422 },
+                                             **{ mode: 1.5 for mode in STORAGE_MODES_YUV420 } }
+    # colormodes possible for a storage mode, the first one is the default
+    STORAGE_MODE_COLORMODES              = { **{ mode: HImageInfo.COLORMODES_MONO + HImageInfo.COLORMODES_BAYER for mode in STORAGE_MODES_MONO + STORAGE_MODES_MIPI },
+                                             **{ mode: [ HImageInfo.COLORMODE_RGB ] for mode in STORAGE_MODES_RGB },
+                                             **{ mode: [ HImageInfo.COLORMODE_YUV444 ] for mode in STORAGE_MODES_YUV444 },
+                                             **{ mode: [ HImageInfo.COLORMODE_YUV422 ] for mode in STORAGE_MODES_YUV422 },
+                                             **{ mode: [ HImageInfo.COLORMODE_YUV420 ] for mode in STORAGE_MODES_YUV420 } }
+    # (y, u, v) sample offsets within each 4 sample group of the interleaved yuv422 modes
+    STORAGE_MODE_YUV422_OFFSETS          = { STORAGE_MODE_YUV422_UYVY_interleaved: (1, 0, 2),
+                                             STORAGE_MODE_YUV422_VYUY_interleaved: (1, 2, 0),
+                                             STORAGE_MODE_YUV422_YUYV_interleaved: (0, 1, 3),
+                                             STORAGE_MODE_YUV422_YVYU_interleaved: (0, 3, 1) }
 
     STORAGE_FORMAT_8       = "8 bit"
     STORAGE_FORMAT_16      = "16 bit"
@@ -361,6 +386,9 @@ class HImageStorageInfo(_Info):
     STORAGE_FORMATS_MIPI = [ STORAGE_FORMAT_8, STORAGE_FORMAT_MIPI_10, STORAGE_FORMAT_MIPI_12, STORAGE_FORMAT_16 ]
     STORAGE_FORMATS        = STORAGE_FORMATS_RAW + STORAGE_FORMATS_PACKED
 
+    STORAGE_FORMAT_BITDEPTH = { STORAGE_FORMAT_8: 8, STORAGE_FORMAT_16: 16, STORAGE_FORMAT_32: 32, STORAGE_FORMAT_MIPI_10: 10, STORAGE_FORMAT_MIPI_12: 12 }
+    STORAGE_FORMAT_BYTES    = { STORAGE_FORMAT_8: 1, STORAGE_FORMAT_16: 2, STORAGE_FORMAT_32: 4, STORAGE_FORMAT_MIPI_10: 5/4, STORAGE_FORMAT_MIPI_12: 3/2 }
+
     STORAGE_ENDIANESS_LITTLE = 'Little Endian'
     STORAGE_ENDIANESS_BIG    = 'Big Endian'
     STORAGE_ENDIANESS        = [ STORAGE_ENDIANESS_LITTLE, STORAGE_ENDIANESS_BIG ]
@@ -377,6 +405,7 @@ class HImageStorageInfo(_Info):
 
     def __init__(self):
         self.ok = True
+        self.batch_depth = 0
         self.params =  {    self.PARAM_STORAGEMODE: { 
                                 'value': HImageStorageInfo.STORAGE_MODE_MONO,
                                 'values': HImageStorageInfo.STORAGE_MODES,
@@ -405,7 +434,7 @@ class HImageStorageInfo(_Info):
         if self.params[self.PARAM_STORAGEMODE]["editable"]:
             if storagemode in self.params[self.PARAM_STORAGEMODE]["values"]:
                 self.params[self.PARAM_STORAGEMODE]["value"] = storagemode
-                return self.validate_params()
+                return self._params_changed()
         return False
 
     def get_storagemode(self):
@@ -418,7 +447,7 @@ class HImageStorageInfo(_Info):
         if self.params[self.PARAM_STORAGEFORMAT]["editable"]:
             if storageformat in self.params[self.PARAM_STORAGEFORMAT]["values"]:
                 self.params[self.PARAM_STORAGEFORMAT]["value"] = storageformat
-                return self.validate_params()
+                return self._params_changed()
         return False
 
     def get_storageformat(self):
@@ -431,7 +460,7 @@ class HImageStorageInfo(_Info):
         if self.params[self.PARAM_ALIGNMENT]["editable"]:
             if alignment in self.params[self.PARAM_ALIGNMENT]["values"]:
                 self.params[self.PARAM_ALIGNMENT]["value"] = alignment
-                return self.validate_params()
+                return self._params_changed()
         return False
 
     def get_alignment(self):
@@ -444,7 +473,7 @@ class HImageStorageInfo(_Info):
         if self.params[self.PARAM_ENDIANESS]["editable"]:
             if endianess in self.params[self.PARAM_ENDIANESS]["values"]:
                 self.params[self.PARAM_ENDIANESS]["value"] = endianess
-                return self.validate_params()
+                return self._params_changed()
         return False
 
     def get_endianess(self):
@@ -455,54 +484,23 @@ class HImageStorageInfo(_Info):
 
     def get_bitdepth(self):
         if self.ok:
-            storage_format = self.params[self.PARAM_STORAGEFORMAT]["value"]
-
-            if storage_format == HImageStorageInfo.STORAGE_FORMAT_8:
-                return 8
-            if storage_format == HImageStorageInfo.STORAGE_FORMAT_16:
-                return 16
-            if storage_format == HImageStorageInfo.STORAGE_FORMAT_32:
-                return 32
-            if storage_format == HImageStorageInfo.STORAGE_FORMAT_MIPI_10:
-                return 10
-            if storage_format == HImageStorageInfo.STORAGE_FORMAT_MIPI_12:
-                return 12
-
+            return HImageStorageInfo.STORAGE_FORMAT_BITDEPTH.get(self.params[self.PARAM_STORAGEFORMAT]["value"], 0)
         return 0
 
 
     def get_bpp(self):
-        if self.ok:
-            bpp = 0
+        bpp_num, bpp_den = self.get_bpp_ratio()
+        return bpp_num / bpp_den
 
+
+    def get_bpp_ratio(self):
+        # bytes per pixel as exact fraction (numerator, denominator), packed formats and subsampling give no whole numbers
+        if self.ok:
             storage_mode = self.params[self.PARAM_STORAGEMODE]["value"]
             storage_format = self.params[self.PARAM_STORAGEFORMAT]["value"]
-
-            if storage_format == HImageStorageInfo.STORAGE_FORMAT_8:
-                bpp = 1
-            elif storage_format == HImageStorageInfo.STORAGE_FORMAT_16:
-                bpp = 2
-            elif storage_format == HImageStorageInfo.STORAGE_FORMAT_32:
-                bpp = 4
-            elif storage_format == HImageStorageInfo.STORAGE_FORMAT_MIPI_10:
-                bpp = 5/4
-            elif storage_format == HImageStorageInfo.STORAGE_FORMAT_MIPI_12:
-                bpp = 3/2
-
-            if storage_mode in HImageStorageInfo.STORAGE_MODES_MONO :
-                return bpp * 1
-            elif storage_mode in HImageStorageInfo.STORAGE_MODES_RGB:
-                return bpp * 3
-            elif storage_mode in HImageStorageInfo.STORAGE_MODES_YUV444:
-                return bpp * 3
-            elif storage_mode in HImageStorageInfo.STORAGE_MODES_YUV422:
-                return bpp * 2
-            elif storage_mode in HImageStorageInfo.STORAGE_MODES_YUV420:
-                return bpp * 1.5
-            elif storage_mode in HImageStorageInfo.STORAGE_MODES_MIPI:
-                return bpp
-
-        return 0
+            bpp = Fraction(HImageStorageInfo.STORAGE_FORMAT_BYTES.get(storage_format, 0)) * Fraction(HImageStorageInfo.STORAGE_MODE_SAMPLES.get(storage_mode, 0))
+            return bpp.numerator, bpp.denominator
+        return 0, 1
 
 
 
@@ -518,11 +516,50 @@ class HImageStorageInfo(_Info):
 
 class HImage():
 
+    # (y, x) offsets of the red, both green and the blue pixel within a 2x2 bayer cell
+    BAYER_OFFSETS = {
+        HImageInfo.COLORMODE_BAYER_RGGB: ((0,0), (0,1), (1,0), (1,1)),
+        HImageInfo.COLORMODE_BAYER_GBRG: ((1,0), (0,0), (1,1), (0,1)),
+        HImageInfo.COLORMODE_BAYER_BGGR: ((1,1), (0,1), (1,0), (0,0)),
+        HImageInfo.COLORMODE_BAYER_GRBG: ((0,1), (0,0), (1,1), (1,0)),
+    }
+
+    SUBSAMPLING_NONE = ((1,1),(1,1),(1,1))
+    SUBSAMPLING = {
+        HImageInfo.COLORMODE_YUV422: ((1,1),(2,1),(2,1)),
+        HImageInfo.COLORMODE_YUV420: ((1,1),(2,2),(2,2)),
+    }
+
+    # file extensions of the image formats read by the own readers, all others are left to pil
+    FILE_EXTS_PGMPPM = frozenset(['.pgm', '.ppm'])
+    FILE_EXTS_RAW = frozenset(['.raw', '.rgb', '.yuv', '.dump'])
+
+    # pil mode of the 8 bit array built by get_image for each colormode
+    PIL_MODES = { **{ colormode: 'L' for colormode in HImageInfo.COLORMODES_MONO },
+                  **{ colormode: 'RGB' for colormode in HImageInfo.COLORMODES_BAYER + HImageInfo.COLORMODES_RGB },
+                  **{ colormode: 'YCbCr' for colormode in HImageInfo.COLORMODES_YUV } }
+
     def __init__(self):
 
         self.image_info = None
         self.image_pil = None
         self.image_data = []
+        # equally sized components are kept as the planes of one (c, h, w) array, image_data holds views on them
+        self.image_planes = None
+
+        # the cached pil image is only valid as long as its version matches the image data version
+        self.data_version = 0
+        self.image_pil_version = -1
+
+        # shift from the msb aligned image data to the image bitdepth and to 8 bit
+        self.bitshift = 0
+        self.bitshift_8 = 0
+        # (x, y) subsampling factors of each color component
+        self.subsampling = HImage.SUBSAMPLING_NONE
+        # frequently needed image info values
+        self.image_width = 0
+        self.image_height = 0
+        self.image_components = 0
 
         self.ok = False
 
@@ -570,12 +607,53 @@ class HImage():
                         logging.error("image_info and image_data mismatch - height does not match")
                         ok = False
             if ok:
+                # store the image data in the narrowest container for the image bitdepth
+                data_dtype = cls.data_dtype(image_info.get_bitdepth())
                 for i in range(len(image_data)):
-                    image_data[i] = image_data[i].astype(np.uint32)
+                    image_data[i] = cls.align_data(image_data[i], data_dtype)
 
             return ok
 
 
+    @staticmethod
+    def data_dtype(bitdepth):
+        # image data is stored msb aligned in the narrowest unsigned type holding the bitdepth
+        if bitdepth <= 8:
+            return np.uint8
+        elif bitdepth <= 16:
+            return np.uint16
+        else:
+            return np.uint32
+
+
+    @staticmethod
+    def align_data(data, dtype):
+        # moves msb aligned image data into another container type, keeping it msb aligned
+        # unsigned types up to 32 bit are msb aligned within their size, anything else within 32 bit
+        if data.dtype in (np.uint8, np.uint16, np.uint32):
+            data_bits = data.dtype.itemsize * 8
+        else:
+            data_bits = 32
+        dtype_bits = np.dtype(dtype).itemsize * 8
+        if data_bits > dtype_bits:
+            return (data >> (data_bits - dtype_bits)).astype(dtype)
+        elif data_bits < dtype_bits:
+            return data.astype(dtype) << (dtype_bits - data_bits)
+        else:
+            return data.astype(dtype, copy=False)
+
+
+    @classmethod
+    def _split_bayer(cls, pixel_array, colormode):
+        # returns strided views on the red, the upper and lower row green and the blue pixels of each bayer cell
+        (ry, rx), (g0y, g0x), (g1y, g1x), (by, bx) = cls.BAYER_OFFSETS[colormode]
+        pixel_array_r = pixel_array[ry::2, rx::2]
+        pixel_array_g0 = pixel_array[g0y::2, g0x::2]
+        pixel_array_g1 = pixel_array[g1y::2, g1x::2]
+        pixel_array_b = pixel_array[by::2, bx::2]
+        return pixel_array_r, pixel_array_g0, pixel_array_g1, pixel_array_b
+
+
     def open(self, file_name=None, storage_info=None, image_info=None, config_function=None):
         if self.ok:
             logging.error("HImage class already initialized")
@@ -588,13 +666,10 @@ class HImage():
             self.ok = False
         else:
             # determine the iamge Reader class and create the image reader
-            if (  file_name.lower().endswith(".pgm") or
-                file_name.lower().endswith(".ppm") ) :
+            file_ext = os.path.splitext(file_name)[1].lower()
+            if file_ext in HImage.FILE_EXTS_PGMPPM:
                 himage = HImageReaderPgmPpm(file_name)
-            elif (  file_name.lower().endswith(".raw") or
-                    file_name.lower().endswith(".rgb") or
-                    file_name.lower().endswith(".yuv") or
-                    file_name.lower().endswith(".dump") ) :
+            elif file_ext in HImage.FILE_EXTS_RAW:
                 himage = HImageReaderRaw(file_name)
             else:
                 himage = HImageReaderPIL(file_name)
@@ -614,11 +689,16 @@ class HImage():
                 # read the image data and close the image file reader        
                 himage.read()
                 self.ok, self.image_info, self.image_data = himage.close()
+                if self.ok:
+                    data_dtype = self.data_dtype(self.image_info.get_bitdepth())
+                    self.image_data = [self.align_data(data, data_dtype) for data in self.image_data]
+                self._update_data()
 
         return self.ok
 
 
-    def create(self, image_info=None, image_data=None):
+    def create(self, image_info=None, image_data=None, copy=False):
+        # the HImage takes over the given image data arrays unless a copy is requested
         if self.ok:
             logging.error("HImage class already initialized")
             return False
@@ -626,124 +706,158 @@ class HImage():
             logging.error("HImage class already initialized")
             return False
         else:
-            self.image_data = copy.deepcopy(image_data)
-            self.image_info = copy.deepcopy(image_info)
+            if copy:
+                self.image_data = [np.copy(data) for data in image_data]
+            else:
+                self.image_data = list(image_data)
+            self.image_info = image_info.clone()
             self.ok = self.image_info.validate_params()
+            self._update_data()
 
             return self.ok
 
 
+    def _update_data(self):
+        # to be called whenever image data or image info have been replaced
+        self.data_version += 1
+        if self.ok:
+            # the image info describes the image data from now on and must not be changed anymore
+            self.image_info.freeze_params()
+            data_bits = self.image_data[0].dtype.itemsize * 8
+            self.bitshift = data_bits - self.image_info.get_bitdepth()
+            self.bitshift_8 = data_bits - 8
+            self.subsampling = HImage.SUBSAMPLING.get(self.image_info.get_colormode(), HImage.SUBSAMPLING_NONE)
+            self.image_width, self.image_height = self.image_info.get_size()
+            self.image_components = self.image_info.get_components()
+            if self.subsampling == HImage.SUBSAMPLING_NONE:
+                if len(self.image_data) == 1:
+                    self.image_planes = self.image_data[0][np.newaxis]
+                elif self._are_planes(self.image_data):
+                    self.image_planes = self.image_data[0].base
+                else:
+                    self.image_planes = np.stack(self.image_data)
+                self.image_data = list(self.image_planes)
+            else:
+                self.image_planes = None
+
+
+    @staticmethod
+    def _are_planes(image_data):
+        # true when the components already are the planes of one (c, h, w) array in their order
+        planes = image_data[0].base
+        return (isinstance(planes, np.ndarray) and planes.shape == (len(image_data),) + image_data[0].shape and
+                all(data.dtype == plane.dtype and data.strides == plane.strides and data.ctypes.data == plane.ctypes.data
+                    for data, plane in zip(image_data, planes)))
+
+
     def get_imageinfo(self):
+        # the image info is frozen and shared with the caller, use clone() to get an alterable copy
         if not self.ok: 
             return None
         else:
-            return copy.deepcopy(self.image_info)
+            return self.image_info
 
 
     def get_imagedata(self, component=-1):
         if not self.ok: 
             return None
         elif component < 0:
-            return copy.deepcopy(self.image_data)
-        elif self.image_info.get_component() < component:
-            return copy.deepcopy(self.image_data[component])
+            return [self._readonly_view(data) for data in self.image_data]
+        elif component < self.image_info.get_components():
+            return self._readonly_view(self.image_data[component])
+
+
+    def get_imageplanes(self):
+        # all components as one (c, h, w) array, not available for subsampled components
+        if not self.ok or self.image_planes is None:
+            return None
+        else:
+            return self._readonly_view(self.image_planes)
+
+
+    @staticmethod
+    def _readonly_view(data):
+        # callers get a view on the image data instead of a copy, but are not allowed to alter it
+        view = data.view()
+        view.flags.writeable = False
+        return view
 
 
     def get_pixel(self, xpos, ypos, component=-1):
         if not self.ok:
             return None
-        elif (xpos < 0) or (xpos >= self.image_info.get_width()):
+        elif (xpos < 0) or (xpos >= self.image_width):
             return None
-        elif (ypos < 0) or (ypos >= self.image_info.get_height()):
+        elif (ypos < 0) or (ypos >= self.image_height):
             return None
-        elif (component >= self.image_info.get_components()):
+        elif (component >= self.image_components):
             return None
         else:
-            if self.image_info.get_colormode() == HImageInfo.COLORMODE_YUV422:
-                sub = ((1,1),(2,1),(2,1))
-            elif self.image_info.get_colormode() == HImageInfo.COLORMODE_YUV420:
-                sub = ((1,1),(2,2),(2,2))
-            else: 
-                sub = ((1,1),(1,1),(1,1))
-            color = []
-            colors = self.image_info.get_components()
-            bitshift = 32 - self.image_info.get_bitdepth()
-            for c in range(colors):
-                if (component < 0) or (component == c):
-                    color.append( self.image_data[c][ypos//sub[c][1]][xpos//sub[c][0]] >> bitshift )
-            return color
+            sub = self.subsampling
+            if component < 0:
+                colors = self.image_components
+                return [ self.image_data[c][ypos//sub[c][1], xpos//sub[c][0]] >> self.bitshift for c in range(colors) ]
+            else:
+                c = component
+                sub_x, sub_y = sub[c]
+                return [ self.image_data[c][ypos//sub_y, xpos//sub_x] >> self.bitshift ]
+
+
+    def _data_8bit(self, data):
+        # reduces msb aligned image data to 8 bit for display
+        if data.dtype == np.uint8:
+            return data
+        elif data.flags.c_contiguous and data.dtype.isnative:
+            # just a view on the most significant byte of each value, no shift pass over the data
+            msb = data.dtype.itemsize - 1 if sys.byteorder == 'little' else 0
+            return data.view(np.uint8)[..., msb::data.dtype.itemsize]
+        else:
+            return (data >> self.bitshift_8).astype(np.uint8)
 
 
     def get_image(self):
         if not self.ok: 
             return None
-        elif self.image_pil :
+        elif self.image_pil is not None and self.image_pil_version == self.data_version:
             return self.image_pil
         else:
-            imagedata = copy.deepcopy(self.image_data)
+            imagedata = list(self.image_data)
 
+            colormode = self.image_info.get_colormode()
             image_array_pil = None
-            image_mode_pil = None
-            if self.image_info.get_colormode() in HImageInfo.COLORMODES_MONO:
-                image_mode_pil = 'L'
-                image_array_pil = imagedata[0]
-            elif self.image_info.get_colormode() in HImageInfo.COLORMODES_BAYER:
-                # very implement a simple 'debayering' 
-                pixel_array = imagedata[0]
-                if self.image_info.get_colormode() in HImageInfo.COLORMODE_BAYER_RGGB:
-                    pixel_array_r  = pixel_array[0::2, 0::2]
-                    pixel_array_gr = pixel_array[0::2, 1::2]
-                    pixel_array_gb = pixel_array[1::2, 0::2]
-                    pixel_array_b  = pixel_array[1::2, 1::2]
-                    pixel_array_g  = np.hstack((pixel_array_gr,pixel_array_gb))
-                if self.image_info.get_colormode() in HImageInfo.COLORMODE_BAYER_BGGR:
-                    pixel_array_b  = pixel_array[0::2, 0::2]
-                    pixel_array_gb = pixel_array[0::2, 1::2]
-                    pixel_array_gr = pixel_array[1::2, 0::2]
-                    pixel_array_r  = pixel_array[1::2, 1::2]
-                    pixel_array_g  = np.hstack((pixel_array_gb,pixel_array_gr))
-                if self.image_info.get_colormode() in HImageInfo.COLORMODE_BAYER_GBRG:
-                    pixel_array_gb = pixel_array[0::2, 0::2]
-                    pixel_array_b  = pixel_array[0::2, 1::2]
-                    pixel_array_r  = pixel_array[1::2, 0::2]
-                    pixel_array_gr = pixel_array[1::2, 1::2]
-                    pixel_array_g  = np.hstack((pixel_array_gb,pixel_array_gr))
-                if self.image_info.get_colormode() in HImageInfo.COLORMODE_BAYER_GRBG:
-                    pixel_array_gr = pixel_array[0::2, 0::2]
-                    pixel_array_r  = pixel_array[0::2, 1::2]
-                    pixel_array_b  = pixel_array[1::2, 0::2]
-                    pixel_array_gb = pixel_array[1::2, 1::2]
-                    pixel_array_g  = np.hstack((pixel_array_gr,pixel_array_gb))
-
-                pixel_array_g = pixel_array_g.reshape(self.image_info.get_height(), self.image_info.get_width() // 2).repeat(2, axis=1)
-                pixel_array_r = pixel_array_r.repeat(2, axis=0).repeat(2, axis=1)
-                pixel_array_b = pixel_array_b.repeat(2, axis=0).repeat(2, axis=1)
-
-                image_mode_pil = 'RGB'
-                image_array_pil = np.array([pixel_array_r, pixel_array_g, pixel_array_b])
-                image_array_pil = image_array_pil.transpose(1,2,0)
-
-            else:
-                if self.image_info.get_colormode() == HImageInfo.COLORMODE_RGB:
-                    image_mode_pil = 'RGB'
-                elif self.image_info.get_colormode() == HImageInfo.COLORMODE_YUV444:
-                    image_mode_pil = 'YCbCr'
-                elif self.image_info.get_colormode() == HImageInfo.COLORMODE_YUV422:
-                    image_mode_pil= 'YCbCr'
-                    imagedata[1] = imagedata[1].repeat(2, axis=1)
-                    imagedata[2] = imagedata[2].repeat(2, axis=1)
-                elif self.image_info.get_colormode() == HImageInfo.COLORMODE_YUV420:
-                    image_mode_pil = 'YCbCr'
-                    imagedata[1] = imagedata[1].repeat(2, axis=0).repeat(2, axis=1)
-                    imagedata[2] = imagedata[2].repeat(2, axis=0).repeat(2, axis=1)
-
-                image_array_pil = np.array([imagedata[0], imagedata[1], imagedata[2]])
-                image_array_pil = image_array_pil.transpose(1,2,0)
+            image_mode_pil = HImage.PIL_MODES.get(colormode)
+            if colormode in HImageInfo.COLORMODES_MONO:
+                image_array_pil = self._data_8bit(imagedata[0])
+            elif colormode in HImageInfo.COLORMODES_BAYER:
+                # very implement a simple 'debayering'
+                # red and blue are reduced to 8 bit and written to all four pixels of their bayer cell,
+                # each green to both pixels of its row, all in one preallocated full size buffer
+                pixel_array_r, pixel_array_g0, pixel_array_g1, pixel_array_b = self._split_bayer(imagedata[0], colormode)
+                cells_height, cells_width = pixel_array_r.shape
+                image_array_pil = np.empty((cells_height * 2, cells_width * 2, 3), dtype=np.uint8)
+                image_cells = image_array_pil.reshape(cells_height, 2, cells_width, 2, 3)
+                image_cells[..., 0] = self._data_8bit(pixel_array_r)[:, np.newaxis, :, np.newaxis]
+                image_cells[:, 0, :, :, 1] = self._data_8bit(pixel_array_g0)[:, :, np.newaxis]
+                image_cells[:, 1, :, :, 1] = self._data_8bit(pixel_array_g1)[:, :, np.newaxis]
+                image_cells[..., 2] = self._data_8bit(pixel_array_b)[:, np.newaxis, :, np.newaxis]
+
+            elif image_mode_pil:
+                # each component is reduced to 8 bit and written to all pixels it covers with its subsampling
+                # in one preallocated full size buffer
+                image_array_pil = np.empty((self.image_height, self.image_width, 3), dtype=np.uint8)
+                for c, (sub_x, sub_y) in enumerate(self.subsampling):
+                    image_cells = image_array_pil.reshape(self.image_height // sub_y, sub_y, self.image_width // sub_x, sub_x, 3)
+                    image_cells[..., c] = self._data_8bit(imagedata[c])[:, np.newaxis, :, np.newaxis]
 
             if image_mode_pil:
-                image_array_pil >>= 24
-                image_array_pil = image_array_pil.astype(np.uint8)
-                self.image_pil = Image.fromarray(image_array_pil, image_mode_pil)
+                # let pil use the contiguous 8 bit array as image memory instead of copying it
+                image_array_pil = np.ascontiguousarray(image_array_pil)
+                image_size_pil = (image_array_pil.shape[1], image_array_pil.shape[0])
+                self.image_pil = Image.frombuffer(image_mode_pil, image_size_pil, image_array_pil, 'raw', image_mode_pil, 0, 1)
+                if image_mode_pil == 'YCbCr':
+                    # convert yuv once to rgb for display instead of on every use of the cached image
+                    self.image_pil = self.image_pil.convert('RGB')
+                self.image_pil_version = self.data_version
             else:
                 logging.error("failed to create a pil image")
 
@@ -864,6 +978,62 @@ class HImageReader():
 
 class HImageReaderRaw(HImageReader):
 
+    # patterns to derive storage and image info from the filename
+    RE_SIZE            = re.compile('([0-9]+)[xX*]([0-9]+)')
+    RE_BITDEPTH        = re.compile('([0-9]+)[bB]')
+    RE_RGB             = re.compile('[^0-9A-Z]RGB[^0-9A-Z]', re.IGNORECASE)
+    RE_YUV             = re.compile('[^0-9A-Z]YUV[^0-9A-Z]', re.IGNORECASE)
+    RE_MIPI            = re.compile('[^0-9A-Z]MIPI[^0-9A-Z]', re.IGNORECASE)
+    RE_SUBSAMPLING_444 = re.compile('[^0-9]444[^0-9]')
+    RE_SUBSAMPLING_422 = re.compile('[^0-9]422[^0-9]')
+    RE_SUBSAMPLING_420 = re.compile('[^0-9]420[^0-9]')
+
+    # default image and storage params per kind of image data given by the filename: param -> (value, values)
+    # only values that are not None replace the valid values of a param
+    FILE_KIND_PARAMS = {
+        ('mipi', None):  ( { HImageInfo.PARAM_COLORMODE:              ( HImageInfo.COLORMODE_MONO, HImageInfo.COLORMODES_MONO + HImageInfo.COLORMODES_BAYER ) },
+                           { HImageStorageInfo.PARAM_STORAGEMODE:     ( HImageStorageInfo.STORAGE_MODE_MIPI_RAW, HImageStorageInfo.STORAGE_MODES_MIPI ),
+                             HImageStorageInfo.PARAM_STORAGEFORMAT:   ( HImageStorageInfo.STORAGE_FORMAT_MIPI_10, HImageStorageInfo.STORAGE_FORMATS_MIPI ),
+                             HImageStorageInfo.PARAM_ALIGNMENT:       ( HImageStorageInfo.STORAGE_ALIGNMENT_LSB, None ) } ),
+        ('rgb', None):   ( { HImageInfo.PARAM_COLORMODE:              ( HImageInfo.COLORMODE_RGB, [ HImageInfo.COLORMODE_RGB ] ) },
+                           { HImageStorageInfo.PARAM_STORAGEMODE:     ( HImageStorageInfo.STORAGE_MODE_RGB_RGB_interleaved, HImageStorageInfo.STORAGE_MODES_RGB ),
+                             HImageStorageInfo.PARAM_STORAGEFORMAT:   ( HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_FORMATS_RAW ) } ),
+        ('yuv', '444'):  ( { HImageInfo.PARAM_COLORMODE:              ( HImageInfo.COLORMODE_YUV444, [ HImageInfo.COLORMODE_YUV444 ] ) },
+                           { HImageStorageInfo.PARAM_STORAGEMODE:     ( HImageStorageInfo.STORAGE_MODE_YUV444_YUV_interleaved, HImageStorageInfo.STORAGE_MODES_YUV444 ),
+                             HImageStorageInfo.PARAM_STORAGEFORMAT:   ( HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_FORMATS_RAW ) } ),
+        ('yuv', '422'):  ( { HImageInfo.PARAM_COLORMODE:              ( HImageInfo.COLORMODE_YUV422, [ HImageInfo.COLORMODE_YUV422 ] ) },
+                           { HImageStorageInfo.PARAM_STORAGEMODE:     ( HImageStorageInfo.STORAGE_MODE_YUV422_UYVY_interleaved, HImageStorageInfo.STORAGE_MODES_YUV422 ),
+                             HImageStorageInfo.PARAM_STORAGEFORMAT:   ( HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_FORMATS_RAW ) } ),
+        ('yuv', '420'):  ( { HImageInfo.PARAM_COLORMODE:              ( HImageInfo.COLORMODE_YUV420, [ HImageInfo.COLORMODE_YUV420 ] ) },
+                           { HImageStorageInfo.PARAM_STORAGEMODE:     ( HImageStorageInfo.STORAGE_MODE_YUV420_YUV_planar, HImageStorageInfo.STORAGE_MODES_YUV420 ),
+                             HImageStorageInfo.PARAM_STORAGEFORMAT:   ( HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_FORMATS_RAW ) } ),
+        ('yuv', None):   ( { HImageInfo.PARAM_COLORMODE:              ( HImageInfo.COLORMODE_YUV444, HImageInfo.COLORMODES_YUV ) },
+                           { HImageStorageInfo.PARAM_STORAGEMODE:     ( HImageStorageInfo.STORAGE_MODE_YUV422_UYVY_interleaved,
+                                                                        HImageStorageInfo.STORAGE_MODES_YUV444 + HImageStorageInfo.STORAGE_MODES_YUV422 + HImageStorageInfo.STORAGE_MODES_YUV420 ),
+                             HImageStorageInfo.PARAM_STORAGEFORMAT:   ( HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_FORMATS_RAW ) } ),
+        ('mono', None):  ( { HImageInfo.PARAM_COLORMODE:              ( HImageInfo.COLORMODE_MONO, HImageInfo.COLORMODES ) },
+                           { HImageStorageInfo.PARAM_STORAGEMODE:     ( HImageStorageInfo.STORAGE_MODE_MONO, HImageStorageInfo.STORAGE_MODES ),
+                             HImageStorageInfo.PARAM_STORAGEFORMAT:   ( HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_FORMATS ) } ),
+    }
+
+    # numpy dtype of the stored samples per storage format and endianess, packed formats are read bytewise
+    STORAGE_DTYPES = { (storage_format, endianess): np.dtype(f"{endianess_prefix}u{storage_bytes}")
+                       for storage_format, storage_bytes in { HImageStorageInfo.STORAGE_FORMAT_8: 1,
+                                                              HImageStorageInfo.STORAGE_FORMAT_16: 2,
+                                                              HImageStorageInfo.STORAGE_FORMAT_32: 4,
+                                                              HImageStorageInfo.STORAGE_FORMAT_MIPI_10: 1,
+                                                              HImageStorageInfo.STORAGE_FORMAT_MIPI_12: 1 }.items()
+                       for endianess, endianess_prefix in { HImageStorageInfo.STORAGE_ENDIANESS_LITTLE: '<',
+                                                            HImageStorageInfo.STORAGE_ENDIANESS_BIG: '>' }.items() }
+
+    # (pixels, bytes) of each packed group, the file always holds whole groups
+    PACKED_GROUPS = { HImageStorageInfo.STORAGE_FORMAT_MIPI_10: (4, 5),
+                      HImageStorageInfo.STORAGE_FORMAT_MIPI_12: (2, 3) }
+
+    # position of the lsb of each pixel within the last byte of a packed mipi group
+    MIPI10_LSB_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+    MIPI12_LSB_SHIFTS = np.array([0, 4], dtype=np.uint8)
+
     def __init__(self, file_name):
         super().__init__(file_name)
         self.image_file = None
@@ -872,18 +1042,19 @@ class HImageReaderRaw(HImageReader):
     def open(self, ext_storage_info=None, ext_image_info=None):
         if self.file_name is not None:
             # read storage and image info from fileheader (in this case only parsing the filename) 
-            match_size            = re.compile('([0-9]+)[xX*]([0-9]+)').findall(self.file_name)
-            match_bitdepth        = re.compile('([0-9]+)[bB]').findall(self.file_name)
-            match_rgb             = re.compile('[^0-9A-Z]RGB[^0-9A-Z]', re.IGNORECASE).findall(self.file_name)
-            match_yuv             = re.compile('[^0-9A-Z]YUV[^0-9A-Z]', re.IGNORECASE).findall(self.file_name)
-            match_mipi            = re.compile('[^0-9A-Z]MIPI[^0-9A-Z]', re.IGNORECASE).findall(self.file_name)
-            match_subsampling_444 = re.compile('[^0-9]444[^0-9]').findall(self.file_name)
-            match_subsampling_422 = re.compile('[^0-9]422[^0-9]').findall(self.file_name)
-            match_subsampling_420 = re.compile('[^0-9]420[^0-9]').findall(self.file_name)
-
-            file_ending_rgb = self.file_name.lower().endswith(".rgb")
-            file_ending_yuv = self.file_name.lower().endswith(".yuv")
-            file_ending_dump = self.file_name.lower().endswith(".dump")
+            match_size            = HImageReaderRaw.RE_SIZE.findall(self.file_name)
+            match_bitdepth        = HImageReaderRaw.RE_BITDEPTH.findall(self.file_name)
+            match_rgb             = HImageReaderRaw.RE_RGB.findall(self.file_name)
+            match_yuv             = HImageReaderRaw.RE_YUV.findall(self.file_name)
+            match_mipi            = HImageReaderRaw.RE_MIPI.findall(self.file_name)
+            match_subsampling_444 = HImageReaderRaw.RE_SUBSAMPLING_444.findall(self.file_name)
+            match_subsampling_422 = HImageReaderRaw.RE_SUBSAMPLING_422.findall(self.file_name)
+            match_subsampling_420 = HImageReaderRaw.RE_SUBSAMPLING_420.findall(self.file_name)
+
+            file_ext = os.path.splitext(self.file_name)[1].lower()
+            file_ending_rgb = file_ext == ".rgb"
+            file_ending_yuv = file_ext == ".yuv"
+            file_ending_dump = file_ext == ".dump"
 
             self.image_info = HImageInfo()
             if len(match_size) == 1:
@@ -891,61 +1062,34 @@ class HImageReaderRaw(HImageReader):
                 self.image_info.set_value(HImageInfo.PARAM_HEIGHT, int(match_size[0][1]))
             if len(match_bitdepth) == 1:
                 self.image_info.set_value(HImageInfo.PARAM_BITDEPTH, int(match_bitdepth[0]) )
+
+            # the kind of image data (and for yuv its subsampling) selects the defaults of the colormode and storage
             if file_ending_dump or len(match_mipi) == 1:
-                self.image_info.set_value(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODE_MONO )
-                self.image_info.set_values(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODES_MONO + HImageInfo.COLORMODES_BAYER )
+                file_kind = ('mipi', None)
             elif file_ending_rgb or len(match_rgb) == 1:
-                self.image_info.set_value(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODE_RGB )
-                self.image_info.set_values(HImageInfo.PARAM_COLORMODE, [ HImageInfo.COLORMODE_RGB ] )
+                file_kind = ('rgb', None)
             elif file_ending_yuv or len(match_yuv) == 1:
                 if len(match_subsampling_444) == 1:
-                    self.image_info.set_value(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODE_YUV444 )
-                    self.image_info.set_values(HImageInfo.PARAM_COLORMODE, [ HImageInfo.COLORMODE_YUV444 ] )
+                    file_kind = ('yuv', '444')
                 elif len(match_subsampling_422) == 1:
-                    self.image_info.set_value(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODE_YUV422 )
-                    self.image_info.set_values(HImageInfo.PARAM_COLORMODE, [ HImageInfo.COLORMODE_YUV422 ] )
+                    file_kind = ('yuv', '422')
                 elif len(match_subsampling_420) == 1:
-                    self.image_info.set_value(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODE_YUV420 )
-                    self.image_info.set_values(HImageInfo.PARAM_COLORMODE, [ HImageInfo.COLORMODE_YUV420 ] )
+                    file_kind = ('yuv', '420')
                 else:
-                    self.image_info.set_value(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODE_YUV444 )
-                    self.image_info.set_values(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODES_YUV )
+                    file_kind = ('yuv', None)
             else:
-                self.image_info.set_value(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODE_MONO )
-                self.image_info.set_values(HImageInfo.PARAM_COLORMODE, HImageInfo.COLORMODES )
+                file_kind = ('mono', None)
+
+            image_params, storage_params = HImageReaderRaw.FILE_KIND_PARAMS[file_kind]
+            for param, (value, values) in image_params.items():
+                self.image_info.set_value(param, value)
+                self.image_info.set_values(param, values)
 
             self.storage_info = HImageStorageInfo()
-            if file_ending_dump or len(match_mipi) == 1:
-                self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODE_MIPI_RAW)
-                self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODES_MIPI)
-                self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEFORMAT, HImageStorageInfo.STORAGE_FORMAT_MIPI_10)
-                self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEFORMAT, HImageStorageInfo.STORAGE_FORMATS_MIPI )
-                self.storage_info.set_value(HImageStorageInfo.PARAM_ALIGNMENT, HImageStorageInfo.STORAGE_ALIGNMENT_LSB)
-            elif file_ending_rgb or len(match_rgb) == 1:
-                self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODE_RGB_RGB_interleaved)
-                self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODES_RGB)
-                self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEFORMAT, HImageStorageInfo.STORAGE_FORMAT_16)
-                self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEFORMAT, HImageStorageInfo.STORAGE_FORMATS_RAW )
-            elif file_ending_yuv or len(match_yuv) == 1:
-                if len(match_subsampling_444) == 1:
-                    self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODE_YUV444_YUV_interleaved)
-                    self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODES_YUV444)
-                elif len(match_subsampling_422) == 1:
-                    self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODE_YUV422_UYVY_interleaved)
-                    self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODES_YUV422)
-                elif len(match_subsampling_420) == 1:
-                    self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODE_YUV420_YUV_planar)
-                    self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODES_YUV420)
-                else:
-                    self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODE_YUV422_UYVY_interleaved)
-                    self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODES_YUV444 + HImageStorageInfo.STORAGE_MODES_YUV422 + HImageStorageInfo.STORAGE_MODES_YUV420)
-                self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEFORMAT, HImageStorageInfo.STORAGE_FORMAT_16)
-                self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEFORMAT, HImageStorageInfo.STORAGE_FORMATS_RAW )
-            else:
-                self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODE_MONO)
-                self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEMODE, HImageStorageInfo.STORAGE_MODES )
-                self.storage_info.set_value(HImageStorageInfo.PARAM_STORAGEFORMAT, HImageStorageInfo.STORAGE_FORMAT_16)
-                self.storage_info.set_values(HImageStorageInfo.PARAM_STORAGEFORMAT, HImageStorageInfo.STORAGE_FORMATS )
+            for param, (value, values) in storage_params.items():
+                self.storage_info.set_value(param, value)
+                if values is not None:
+                    self.storage_info.set_values(param, values)
 
             self.image_file = open(self.file_name, 'rb')
 
@@ -953,6 +1097,23 @@ class HImageReaderRaw(HImageReader):
 
         return False
 
+    @staticmethod
+    def _unpack_mipi10(packed):
+        # 4 pixels are packed into 5 bytes: the 8 msb of each pixel followed by one byte with all 2 lsb
+        packed = np.reshape(packed, ( -1, 5 ))
+        # all four msb lanes are widened and shifted in one pass straight into the output
+        pixels = np.left_shift(packed[:,:4], 2, out=np.empty((len(packed), 4), dtype=np.uint16), dtype=np.uint16)
+        pixels |= (packed[:,4:] >> HImageReaderRaw.MIPI10_LSB_SHIFTS) & 0x03
+        return pixels.ravel()
+
+    @staticmethod
+    def _unpack_mipi12(packed):
+        # 2 pixels are packed into 3 bytes: the 8 msb of each pixel followed by one byte with both 4 lsb
+        packed = np.reshape(packed, ( -1, 3 ))
+        pixels = np.left_shift(packed[:,:2], 4, out=np.empty((len(packed), 2), dtype=np.uint16), dtype=np.uint16)
+        pixels |= (packed[:,2:] >> HImageReaderRaw.MIPI12_LSB_SHIFTS) & 0x0f
+        return pixels.ravel()
+
     def read(self):
         HImageReader.read(self)
 
@@ -960,14 +1121,38 @@ class HImageReaderRaw(HImageReader):
             self.ok = False
 
         if self.ok:
-            cursor = self.image_file.tell()
-            self.image_file.seek(0, os.SEEK_END)
-            filesize = self.image_file.tell() - cursor
-            self.image_file.seek(cursor, os.SEEK_SET)
+            image_width, image_height = self.image_info.get_size()
+            image_bitdepth = self.image_info.get_bitdepth()
+            storage_mode = self.storage_info.get_storagemode()
+            storage_format = self.storage_info.get_storageformat()
+            storage_samples = HImageStorageInfo.STORAGE_MODE_SAMPLES[storage_mode]
+
+            # the geometry has to fit the storage layout, otherwise the planes can not be split
+            if image_width <= 0 or image_height <= 0:
+                logging.error(f"invalid imagesize {image_width}x{image_height}")
+                self.ok = False
+            elif storage_format in HImageStorageInfo.STORAGE_FORMATS_PACKED and storage_samples != 1:
+                logging.error(f"storageformat {storage_format} only supports single sample storage modes")
+                self.ok = False
+            elif storage_mode in HImageStorageInfo.STORAGE_MODES_YUV422 and image_width % 2:
+                logging.error(f"yuv422 needs an even imagewidth, got {image_width}")
+                self.ok = False
+            elif storage_mode in HImageStorageInfo.STORAGE_MODES_YUV420 and (image_width % 2 or image_height % 2):
+                logging.error(f"yuv420 needs an even imagewidth and imageheight, got {image_width}x{image_height}")
+                self.ok = False
+
+        if self.ok:
+            # remaining size of the file behind the (pgm/ppm) header
+            filesize = os.fstat(self.image_file.fileno()).st_size - self.image_file.tell()
 
-            filesize_expected = self.storage_info.get_bpp()
-            filesize_expected *= self.image_info.get_width()
-            filesize_expected *= self.image_info.get_height()
+            if storage_format in HImageReaderRaw.PACKED_GROUPS:
+                # a trailing partial pixel group is still stored as a whole group
+                group_pixels, group_bytes = HImageReaderRaw.PACKED_GROUPS[storage_format]
+                filesize_expected = (image_width * image_height + group_pixels - 1) // group_pixels * group_bytes
+            else:
+                # whole bytes needed for all pixels, computed in integers to be exact for subsampled modes
+                bpp_num, bpp_den = self.storage_info.get_bpp_ratio()
+                filesize_expected = (image_width * image_height * bpp_num + bpp_den - 1) // bpp_den
 
             if filesize < filesize_expected:
                 logging.error("imagesize too small")
@@ -975,72 +1160,61 @@ class HImageReaderRaw(HImageReader):
 
         # read the image data
         if self.ok:
-            storage_type = "u"
-            if self.storage_info.get_storageformat() == HImageStorageInfo.STORAGE_FORMAT_8:
-                storage_type = f"{storage_type}1"
-            elif self.storage_info.get_storageformat() == HImageStorageInfo.STORAGE_FORMAT_16:
-                storage_type = f"{storage_type}2"
-            elif self.storage_info.get_storageformat() == HImageStorageInfo.STORAGE_FORMAT_32:
-                storage_type = f"{storage_type}4"
-            elif self.storage_info.get_storageformat() in HImageStorageInfo.STORAGE_FORMATS_PACKED:
-                storage_type = f"{storage_type}1"
-
-            if self.storage_info.get_endianess() == HImageStorageInfo.STORAGE_ENDIANESS_LITTLE:
-                storage_type = f"<{storage_type}"
-            elif self.storage_info.get_endianess() == HImageStorageInfo.STORAGE_ENDIANESS_BIG:
-                storage_type = f">{storage_type}"
-
             try:
-                imagebuffer = np.fromfile(self.image_file, dtype=np.dtype(storage_type), count=filesize)
-                imagebuffer = imagebuffer.astype(np.uint32)
-
-                # some special code to depack data
-                if self.storage_info.get_storageformat() == HImageStorageInfo.STORAGE_FORMAT_MIPI_10:
-                    imagebuffer = np.reshape(imagebuffer, ( -1, 5 ))
-                    lsb = imagebuffer[:,4]
-                    p_0 = (imagebuffer[:,0] << 2) | ((lsb >> 0 ) & 0x03)
-                    p_1 = (imagebuffer[:,1] << 2) | ((lsb >> 2 ) & 0x03)
-                    p_2 = (imagebuffer[:,2] << 2) | ((lsb >> 4 ) & 0x03)
-                    p_3 = (imagebuffer[:,3] << 2) | ((lsb >> 6 ) & 0x03)
-                    imagebuffer = np.transpose(np.vstack((p_0, p_1, p_2, p_3))).reshape(-1)
-                    imagebuffer = np.resize(imagebuffer,(self.image_info.get_width() * self.image_info.get_height()))
-
-                elif self.storage_info.get_storageformat() == HImageStorageInfo.STORAGE_FORMAT_MIPI_12:
-                    imagebuffer = np.reshape(imagebuffer, ( -1, 3 ))
-                    lsb = imagebuffer[:,2]
-                    p_0 = (imagebuffer[:,0] << 4) | ((lsb >> 0 ) & 0x0f)
-                    p_1 = (imagebuffer[:,1] << 4) | ((lsb >> 4 ) & 0x0f)
-                    imagebuffer = np.transpose(np.vstack((p_0, p_1))).reshape(-1)
-                    imagebuffer = np.resize(imagebuffer,(self.image_info.get_width() * self.image_info.get_height()))
-
-                if self.storage_info.get_alignment() == HImageStorageInfo.STORAGE_ALIGNMENT_LSB:
-                    imagebuffer <<= (32 - self.image_info.get_bitdepth())
-                else:
-                    imagebuffer <<= (32 - self.storage_info.get_bitdepth())
-                    bitmask = ((1 << self.image_info.get_bitdepth()) - 1) << (32 - self.image_info.get_bitdepth())
-                    imagebuffer = np.bitwise_and(imagebuffer, bitmask)
-
-            except:
-                logging.error(f"loading file failed")
+                # map just the expected image data of the file, it is copied once by the alignment below
+                storage_dtype = HImageReaderRaw.STORAGE_DTYPES[(storage_format, self.storage_info.get_endianess())]
+                count = filesize_expected // storage_dtype.itemsize
+                imagebuffer = np.memmap(self.file_name, dtype=storage_dtype, mode='r', offset=self.image_file.tell(), shape=(count,))
+            except (OSError, ValueError) as error:
+                logging.error(f"loading file failed: {error}")
                 self.ok = False
 
-        # interprete the image data
+        # depack and align the image data
         if self.ok:
-            image_data = []
-            if self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_MONO:
-                image_data.append(imagebuffer)
+            # some special code to depack data, done on the packed bytes before widening
+            if storage_format == HImageStorageInfo.STORAGE_FORMAT_MIPI_10:
+                imagebuffer = self._unpack_mipi10(imagebuffer)
+                imagebuffer = imagebuffer[:image_width * image_height]
+
+            elif storage_format == HImageStorageInfo.STORAGE_FORMAT_MIPI_12:
+                imagebuffer = self._unpack_mipi12(imagebuffer)
+                imagebuffer = imagebuffer[:image_width * image_height]
+
+            # align the data to the msb of the narrowest type holding the image bitdepth
+            data_dtype = HImage.data_dtype(image_bitdepth)
+            data_bits = np.dtype(data_dtype).itemsize * 8
+            if self.storage_info.get_alignment() == HImageStorageInfo.STORAGE_ALIGNMENT_LSB:
+                # bits above the image bitdepth are shifted out
+                bitshift = data_bits - image_bitdepth
+            else:
+                bitshift = data_bits - self.storage_info.get_bitdepth()
+            # the byteswap of foreign endian data is done by the same pass that widens or narrows it
+            if bitshift >= 0:
+                # the read only file mapping is copied, the buffer of the mipi depacking is reused
+                imagebuffer = imagebuffer.astype(data_dtype, copy=not imagebuffer.flags.writeable)
+                if bitshift:
+                    imagebuffer <<= bitshift
+            else:
+                imagebuffer = np.right_shift(imagebuffer, -bitshift, out=np.empty(imagebuffer.shape, data_dtype), casting='unsafe')
+            if self.storage_info.get_alignment() == HImageStorageInfo.STORAGE_ALIGNMENT_MSB and self.storage_info.get_bitdepth() > image_bitdepth:
+                # only stored bits below the image bitdepth are left to be cleared
+                bitmask = ((1 << image_bitdepth) - 1) << (data_bits - image_bitdepth)
+                imagebuffer &= bitmask
 
-            elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_MIPI:
+        # interprete the image data, the layout of the planes follows from the samples per pixel of the storage mode
+        if self.ok:
+            image_data = []
+            if storage_samples == 1:
                 image_data.append(imagebuffer)
 
-            elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_RGB + HImageStorageInfo.STORAGE_MODES_YUV444:
-                if self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_PLANAR:
-                    image_array = np.reshape(imagebuffer, ( 3, self.image_info.get_width() * self.image_info.get_height()))
+            elif storage_samples == 3:
+                if storage_mode in HImageStorageInfo.STORAGE_MODES_PLANAR:
+                    image_array = np.reshape(imagebuffer, ( 3, image_width * image_height))
 
-                elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_INTERLEAVED:
-                    image_array = np.reshape(imagebuffer, ( self.image_info.get_width() * self.image_info.get_height(), 3)).transpose(1,0)
+                elif storage_mode in HImageStorageInfo.STORAGE_MODES_INTERLEAVED:
+                    image_array = np.reshape(imagebuffer, ( image_width * image_height, 3)).transpose(1,0)
 
-                if self.storage_info.get_storagemode() == HImageStorageInfo.STORAGE_MODE_RGB_BGR_interleaved:
+                if storage_mode == HImageStorageInfo.STORAGE_MODE_RGB_BGR_interleaved:
                     image_data.append(image_array[2,:])
                     image_data.append(image_array[1,:])
                     image_data.append(image_array[0,:])
@@ -1050,67 +1224,51 @@ class HImageReaderRaw(HImageReader):
                     image_data.append(image_array[1,:])
                     image_data.append(image_array[2,:])
 
-            elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_YUV422:
-                if self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_PLANAR:
-                    image_array = np.reshape(imagebuffer, ( 2, self.image_info.get_width() * self.image_info.get_height()))
+            elif storage_samples == 2:
+                if storage_mode in HImageStorageInfo.STORAGE_MODES_PLANAR:
+                    image_array = np.reshape(imagebuffer, ( 2, image_width * image_height))
 
                     luma_array = image_array[0,:]
-                    chroma_array = np.reshape(image_array[1,:], ( 2, int(self.image_info.get_width() * self.image_info.get_height() / 2)))
+                    chroma_array = np.reshape(image_array[1,:], ( 2, image_width * image_height // 2))
 
                     image_data.append(luma_array)
-                    if self.storage_info.get_storagemode() in [ HImageStorageInfo.STORAGE_YUV422_YUV_planar ]:
+                    if storage_mode == HImageStorageInfo.STORAGE_MODE_YUV422_YUV_planar:
                         image_data.append(chroma_array[0,:])
                         image_data.append(chroma_array[1,:])
 
-                    elif self.storage_info.get_storagemode() in [ HImageStorageInfo.STORAGE_YUV422_YVU_planar ]:
+                    elif storage_mode == HImageStorageInfo.STORAGE_MODE_YUV422_YVU_planar:
                         image_data.append(chroma_array[1,:])
                         image_data.append(chroma_array[0,:])
 
-                elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_INTERLEAVED:
-                    image_array = np.reshape(imagebuffer, ( self.image_info.get_width() * self.image_info.get_height(), 2)).transpose(1,0)
-
-                    if self.storage_info.get_storagemode() in [ HImageStorageInfo.STORAGE_YUV422_UYVY_interleaved, HImageStorageInfo.STORAGE_YUV422_VYUY_interleaved ]:
-                        luma_array = image_array[1,:]
-                        chroma_array = np.reshape(image_array[0,:], ( int(self.image_info.get_width() * self.image_info.get_height() / 2), 2)).transpose(1,0)
-
-                    elif self.storage_info.get_storagemode() in [ HImageStorageInfo.STORAGE_YUV422_YUYV_interleaved, HImageStorageInfo.STORAGE_YUV422_YVYU_interleaved ]:
-                        luma_array = image_array[0,:]
-                        chroma_array = np.reshape(image_array[1,:], ( int(self.image_info.get_width() * self.image_info.get_height() / 2), 2)).transpose(1,0)
-
-                    image_data.append(luma_array)
-                    if self.storage_info.get_storagemode() in [ HImageStorageInfo.STORAGE_YUV422_UYVY_interleaved, HImageStorageInfo.STORAGE_YUV422_YUYV_interleaved ]:
-                        image_data.append(chroma_array[0,:])
-                        image_data.append(chroma_array[1,:])
+                elif storage_mode in HImageStorageInfo.STORAGE_MODES_INTERLEAVED:
+                    # pick the planes as strided views out of the sample stream, no copies needed
+                    luma_offset, u_offset, v_offset = HImageStorageInfo.STORAGE_MODE_YUV422_OFFSETS[storage_mode]
+                    image_data.append(imagebuffer[luma_offset::2])
+                    image_data.append(imagebuffer[u_offset::4])
+                    image_data.append(imagebuffer[v_offset::4])
 
-                    elif self.storage_info.get_storagemode() in [ HImageStorageInfo.STORAGE_YUV422_VYUY_interleaved, HImageStorageInfo.STORAGE_YUV422_YVYU_interleaved ]:
-                        image_data.append(chroma_array[1,:])
-                        image_data.append(chroma_array[0,:])
-            
-            elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_YUV420:
+            elif storage_samples == 1.5:
                 logging.error("yuv420 no implemented yet")
                 self.ok = False
 
         if self.ok:
-            if self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_MONO:
-                image_data[0] = np.reshape(image_data[0], ( self.image_info.get_height(), self.image_info.get_width() ))
+            if storage_samples == 1:
+                image_data[0] = np.reshape(image_data[0], ( image_height, image_width ))
 
-            elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_MIPI:
-                image_data[0] = np.reshape(image_data[0], ( self.image_info.get_height(), self.image_info.get_width() ))
+            elif storage_samples == 3:
+                image_data[0] = np.reshape(image_data[0], ( image_height, image_width ))
+                image_data[1] = np.reshape(image_data[1], ( image_height, image_width ))
+                image_data[2] = np.reshape(image_data[2], ( image_height, image_width ))
 
-            elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_RGB + HImageStorageInfo.STORAGE_MODES_YUV444:
-                image_data[0] = np.reshape(image_data[0], ( self.image_info.get_height(), self.image_info.get_width() ))
-                image_data[1] = np.reshape(image_data[1], ( self.image_info.get_height(), self.image_info.get_width() ))
-                image_data[2] = np.reshape(image_data[2], ( self.image_info.get_height(), self.image_info.get_width() ))
+            elif storage_samples == 2:
+                image_data[0] = np.reshape(image_data[0], ( image_height, image_width ))
+                image_data[1] = np.reshape(image_data[1], ( image_height, image_width // 2 ))
+                image_data[2] = np.reshape(image_data[2], ( image_height, image_width // 2 ))
 
-            elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_YUV422:
-                image_data[0] = np.reshape(image_data[0], ( int(self.image_info.get_height()    ), self.image_info.get_width()))
-                image_data[1] = np.reshape(image_data[1], ( int(self.image_info.get_height() / 2), self.image_info.get_width()))
-                image_data[2] = np.reshape(image_data[2], ( int(self.image_info.get_height() / 2), self.image_info.get_width()))
-
-            elif self.storage_info.get_storagemode() in HImageStorageInfo.STORAGE_MODES_YUV420:
-                image_data[0] = np.reshape(image_data[0], ( int(self.image_info.get_height()    ), int(self.image_info.get_width())))
-                image_data[1] = np.reshape(image_data[1], ( int(self.image_info.get_height() / 2), int(self.image_info.get_width() / 2) ))
-                image_data[2] = np.reshape(image_data[2], ( int(self.image_info.get_height() / 2), int(self.image_info.get_width() / 2) ))
+            elif storage_samples == 1.5:
+                image_data[0] = np.reshape(image_data[0], ( image_height, image_width ))
+                image_data[1] = np.reshape(image_data[1], ( image_height // 2, image_width // 2 ))
+                image_data[2] = np.reshape(image_data[2], ( image_height // 2, image_width // 2 ))
 
             self.image_data = image_data
 
@@ -1219,13 +1377,9 @@ class HImageReaderPgmPpm(HImageReaderRaw):
                 self.image_info.set_editable(HImageInfo.PARAM_HEIGHT, False)
 
                 # read the max value and determine image bitdepth
-                image_bitdepth = 0
-                for i in range(32):
-                    if (1 << i) > header_maxpix:
-                        break
-                    image_bitdepth += 1
+                image_bitdepth = max(1, header_maxpix.bit_length())
                 self.image_info.set_value(HImageInfo.PARAM_BITDEPTH, image_bitdepth)
-                self.image_info.set_values(HImageInfo.PARAM_BITDEPTH, [i for i in range (1,self.storage_info.get_bitdepth()+1)])
+                self.image_info.set_values(HImageInfo.PARAM_BITDEPTH, list(range(1, self.storage_info.get_bitdepth()+1)))
                 self.image_info.set_editable(HImageInfo.PARAM_BITDEPTH, True)
 
                 ok = self.image_info.validate_params()
@@ -1255,22 +1409,25 @@ class HImageReaderPIL(HImageReader):
     def open(self, ext_storage_info=None, ext_image_info=None):
         if self.file_name is not None:
             try:
+                # pil raises an OSError for unknown formats and broken files
                 self.image_pil = Image.open(self.file_name)
+            except (OSError, ValueError) as error:
+                logging.error(f"opening file '{self.file_name}' failed: {error}")
+                return False
 
-                self.image_info = HImageInfo()
+            self.image_info = HImageInfo()
+            with self.image_info.batch_update():
                 self.image_info.set_colormode(HImageInfo.COLORMODE_RGB)
                 self.image_info.set_bitdepth(8)
                 self.image_info.set_size(self.image_pil.size[0], self.image_pil.size[1])
-                self.image_info.freeze_params()
-            except:
-                logging.error(f"opening file '{self.file_name}' failed")
-                return False
+            self.image_info.freeze_params()
 
             self.storage_info = HImageStorageInfo()
-            self.storage_info.set_storagemode(HImageStorageInfo.STORAGE_MODE_RGB_RGB_interleaved)
-            self.storage_info.set_storageformat(HImageStorageInfo.STORAGE_FORMAT_8)
-            self.storage_info.set_alignment(HImageStorageInfo.STORAGE_ALIGNMENT_LSB)
-            self.storage_info.set_endianess(HImageStorageInfo.STORAGE_ENDIANESS_LITTLE)
+            with self.storage_info.batch_update():
+                self.storage_info.set_storagemode(HImageStorageInfo.STORAGE_MODE_RGB_RGB_interleaved)
+                self.storage_info.set_storageformat(HImageStorageInfo.STORAGE_FORMAT_8)
+                self.storage_info.set_alignment(HImageStorageInfo.STORAGE_ALIGNMENT_LSB)
+                self.storage_info.set_endianess(HImageStorageInfo.STORAGE_ENDIANESS_LITTLE)
             self.storage_info.freeze_params()
 
             return HImageReader.open(self, ext_storage_info, ext_image_info)
@@ -1285,21 +1442,13 @@ class HImageReaderPIL(HImageReader):
             self.ok = False
 
         if self.ok:
-            image_buffer = np.array(self.image_pil)
-            image_buffer = np.reshape(image_buffer, ( self.image_info.get_width() * self.image_info.get_height(), 3))
-            image_buffer = image_buffer.transpose(1,0)
-            image_buffer = image_buffer.astype(np.uint32)
-            image_buffer <<= (32 - self.image_info.get_bitdepth())
-
-            image_data = []
-            image_data.append(image_buffer[0,:])
-            image_data.append(image_buffer[1,:])
-            image_data.append(image_buffer[2,:])
-            image_data[0] = np.reshape(image_data[0], ( self.image_info.get_height(), self.image_info.get_width()))
-            image_data[1] = np.reshape(image_data[1], ( self.image_info.get_height(), self.image_info.get_width()))
-            image_data[2] = np.reshape(image_data[2], ( self.image_info.get_height(), self.image_info.get_width()))
+            # (h, w, 3) pixels to contiguous (3, h, w) planes in the container of the bitdepth in one pass
+            image_pixels = np.asarray(self.image_pil).transpose(2,0,1)
+            data_dtype = HImage.data_dtype(self.image_info.get_bitdepth())
+            image_buffer = np.empty(image_pixels.shape, dtype=data_dtype)
+            np.left_shift(image_pixels, image_buffer.itemsize * 8 - self.image_info.get_bitdepth(), out=image_buffer, dtype=data_dtype)
 
-            self.image_data = image_data
+            self.image_data = [image_buffer[0], image_buffer[1], image_buffer[2]]
         
         return self.ok
 
@@ -1349,13 +1498,14 @@ class _HImageOperator:
     def _init_execute(cls, input_images):
         ok = True
         output_image = None
-        output_text = f"Operation {cls.NAME}\n\n"
+        # text parts are collected in a list and joined once by execute
+        output_text = [ f"Operation {cls.NAME}\n\n" ]
 
         if not input_images:
-            output_text += "No input images given\n"
+            output_text.append("No input images given\n")
             ok = False
         elif len(input_images) != cls.INPUT_IMG_COUNT:
-            output_text += "Invalid number of input images\n"
+            output_text.append("Invalid number of input images\n")
             ok = False
 
         return ok, output_image, output_text
@@ -1365,17 +1515,17 @@ class _HImageOperator:
         ok, output_image, output_text = cls._init_execute(input_images)
 
         if ok:
-            output_text += "Keyword arguments allowed:\n"
-            for args in cls.DESCRIPTION:
-                output_text += f"{args[cls._ARG_NAME]}: {args[cls._ARG_DESCR]} \n"
+            output_text.append("Keyword arguments allowed:\n")
+            for args in cls.ARGUMENTS:
+                output_text.append(f"{args[cls._ARG_NAME]}: {args[cls._ARG_DESCR]} \n")
                 for val in args[cls._ARG_VALS]:
-                    output_text += f"  {val}\n"
+                    output_text.append(f"  {val}\n")
 
-            output_text += "Keyword arguments given:\n"
+            output_text.append("Keyword arguments given:\n")
             for key, value in kwargs.items():
-                output_text += f"{key}: {value}\n"
+                output_text.append(f"{key}: {value}\n")
 
-        return ok, output_image, output_text
+        return ok, output_image, "".join(output_text)
 
 
 
@@ -1403,52 +1553,72 @@ class _HImageOperatorDiff(_HImageOperator):
 
         if ok:
             if not input_images[0].valid():
-                output_text += "input Image 0 not valid\n"
+                output_text.append("input Image 0 not valid\n")
                 ok = False
             elif not input_images[1].valid():
-                output_text += "input Image 1 not valid\n"
+                output_text.append("input Image 1 not valid\n")
                 ok = False
-            elif input_images[0].image_info.get_width() != input_images[1].image_info.get_width():
-                output_text += "Image width does not match\n"
+
+        if ok:
+            # valid images hold their frequently needed image info values
+            image_0, image_1 = input_images
+            if image_0.image_width != image_1.image_width:
+                output_text.append("Image width does not match\n")
                 ok = False
-            elif input_images[0].image_info.get_height() != input_images[1].image_info.get_height():
-                output_text += "Image height does not match\n"
+            elif image_0.image_height != image_1.image_height:
+                output_text.append("Image height does not match\n")
                 ok = False
-            elif input_images[0].image_info.get_components() != input_images[1].image_info.get_components():
-                output_text += "Color components does not match\n"
+            elif image_0.image_components != image_1.image_components:
+                output_text.append("Color components does not match\n")
                 ok = False
-            elif input_images[0].image_info.get_components() != 1 and input_images[0].image_info.get_colormode() != input_images[1].image_info.get_colormode():
-                output_text += "Colormode does not match\n"
+            elif image_0.image_components != 1 and image_0.image_info.get_colormode() != image_1.image_info.get_colormode():
+                output_text.append("Colormode does not match\n")
                 ok = False
-            elif input_images[0].image_info.get_components() <= 1 or input_images[0].image_info.get_components() > 3:
-                output_text += "Wrong number of color components\n"
+            elif image_0.image_components <= 1 or image_0.image_components > 3:
+                output_text.append("Wrong number of color components\n")
                 ok = False
 
         return ok, output_image, output_text
 
+    @staticmethod
+    def _stack_components(image, dtype):
+        # the (c, h, w) image planes msb aligned in dtype, subsampled components as separate (1, h, w) arrays
+        image_planes = image.get_imageplanes()
+        if image_planes is not None:
+            return [ HImage.align_data(image_planes, dtype) ]
+        else:
+            return [ HImage.align_data(data, dtype)[np.newaxis] for data in image.get_imagedata() ]
+
     @classmethod
     def execute(cls, input_images, **kwargs):
         ok, output_image, output_text = cls._init_execute(input_images)
 
         if ok:
             if "diffmode" not in kwargs:
-                output_text += "No diffmode given\n"
+                output_text.append("No diffmode given\n")
                 ok = False
             elif kwargs["diffmode"] not in cls._DIFFMODES:
-                output_text += "Unknown diffmode\n"
+                output_text.append("Unknown diffmode\n")
+                ok = False
+
+            elif kwargs["diffmode"] in [cls._DIFFMODE_ABS_ALL, cls._DIFFMODE_REL_ALL] and input_images[0].image_info.get_colormode() in [HImageInfo.COLORMODE_YUV422, HImageInfo.COLORMODE_YUV420]:
+                output_text.append("Diffmode not supported for subsampled color components\n")
                 ok = False
 
         if ok:
             diff_mode = kwargs["diffmode"]
-            diff_comp = input_images[0].image_info.get_components()
 
-            image_data_A = input_images[0].get_imagedata()
-            image_data_B = input_images[1].get_imagedata()
+            res_image_bitdepth = max( input_images[0].image_info.get_bitdepth(), input_images[1].image_info.get_bitdepth() )
+
+            # compare the images on their data msb aligned in the container of the higher bitdepth
+            # with the components stacked, so that each step runs once over all of them
+            diff_dtype = HImage.data_dtype(res_image_bitdepth)
+            image_data_A = cls._stack_components(input_images[0], diff_dtype)
+            image_data_B = cls._stack_components(input_images[1], diff_dtype)
             res_image_data = []
 
-            res_image_bitdepth = max( input_images[0].image_info.get_bitdepth(), input_images[0].image_info.get_bitdepth() )
-            res_image_width = input_images[0].image_info.get_width()
-            res_image_height = input_images[0].image_info.get_height()
+            res_image_width = input_images[0].image_width
+            res_image_height = input_images[0].image_height
             res_image_colormode = input_images[0].image_info.get_colormode()
             if diff_mode == _HImageOperatorDiff._DIFFMODE_ABS_ALL or diff_mode == _HImageOperatorDiff._DIFFMODE_REL_ALL:
                 res_image_colormode = HImageInfo.COLORMODE_MONO
@@ -1456,43 +1626,52 @@ class _HImageOperatorDiff(_HImageOperator):
 
 
             if (diff_mode == _HImageOperatorDiff._DIFFMODE_ABS_COLOR) or (diff_mode == _HImageOperatorDiff._DIFFMODE_ABS_ALL):
-                for i in range(diff_comp):
-                    image_diff = np.subtract(image_data_A[i], image_data_B[i])
-                    np.absolute(image_diff, out=image_diff)
+                for components_A, components_B in zip(image_data_A, image_data_B):
+                    # the unsigned difference would wrap around, so the smaller value is taken from the bigger one
+                    image_diff = np.maximum(components_A, components_B)
+                    np.subtract(image_diff, np.minimum(components_A, components_B), out=image_diff)
                     res_image_data.append( image_diff )
                 if diff_mode == _HImageOperatorDiff._DIFFMODE_ABS_ALL:
-                    for i in range(1, diff_comp):
-                        res_image_data[0] = np.maximum(res_image_data[0], res_image_data[i])
-                    for i in range(1, diff_comp):
-                        res_image_data.pop(-1)
+                    res_image_data = [ np.max(res_image_data[0], axis=0, keepdims=True) ]
 
             if (diff_mode == _HImageOperatorDiff._DIFFMODE_REL_COLOR) or (diff_mode == _HImageOperatorDiff._DIFFMODE_REL_ALL):
                 image_max = 0
-                for i in range(diff_comp):
-                    image_diff = np.subtract(image_data_A[i], image_data_B[i], dtype=np.double)
-                    np.true_divide(image_diff, 2**(32 - res_image_bitdepth),  out=image_diff)
-                    image_max = max(image_max,  np.amax(image_diff))
-                    image_max = max(image_max, -np.amin(image_diff))
+                # float32 holds the differences of the 8 and 16 bit containers exactly, the 32 bit container needs float64
+                diff_float_dtype = np.float64 if np.dtype(diff_dtype).itemsize == 4 else np.float32
+                for components_A, components_B in zip(image_data_A, image_data_B):
+                    image_diff = np.subtract(components_A, components_B, dtype=diff_float_dtype)
+                    image_max = max(image_max, np.abs(image_diff).max())
                     res_image_data.append( image_diff )
-                image_factor = 1
-                if image_max != 0:
-                    image_factor = 2**7 / image_max
+                if diff_mode == _HImageOperatorDiff._DIFFMODE_REL_ALL:
+                    # keep the difference of the component with the maximal aberration, only this one is scaled
+                    image_diff = res_image_data[0]
+                    diff_index = np.abs(image_diff).argmax(axis=0)[np.newaxis]
+                    res_image_data = [ np.take_along_axis(image_diff, diff_index, axis=0) ]
 
-                for i in range(0, diff_comp):
-                    np.multiply(res_image_data[i], image_factor, out=res_image_data[i])
-                    np.add(res_image_data[i], 2**7, out=res_image_data[i])
-                    np.multiply(res_image_data[i], 2**24, out=res_image_data[i])
-                    res_image_data[i] = res_image_data[i].astype(np.uint32)
+                image_scale = 1
+                if image_max != 0:
+                    image_scale = (2**31 - 2**10) / image_max
+
+                # scale the maximal aberration to just below half of the 32 bit range around its middle,
+                # leaving enough margin that float32 rounding does not reach 2**32,
+                # the add writes the 32 bit result back into the memory of a float32 difference
+                image_offset = 2**31
+                for i in range(len(res_image_data)):
+                    np.multiply(res_image_data[i], image_scale, out=res_image_data[i])
+                    if res_image_data[i].dtype == np.float32:
+                        res_out = res_image_data[i].view(np.uint32)
+                    else:
+                        res_out = np.empty(res_image_data[i].shape, dtype=np.uint32)
+                    res_image_data[i] = np.add(res_image_data[i], image_offset, out=res_out, casting='unsafe')
 
-                if diff_mode == _HImageOperatorDiff._DIFFMODE_REL_ALL:
-                    for i in range(1, diff_comp):
-                        res_image_data.pop(-1)
+            # back to a list of single components
+            res_image_data = [ data for components in res_image_data for data in components ]
 
         if ok:
             output_image = HImage()
             output_image.create(image_info=res_image_info, image_data=res_image_data)
 
-        return ok, output_image, output_text
+        return ok, output_image, "".join(output_text)
 
 
 
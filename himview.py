@@ -21,11 +21,8 @@
 import sys
 import os.path
 import logging
-import copy
-import re
 import time
 import json
-import glob
 
 from himage import HImage, HImageInfo, HImageStorageInfo
 from himage import HImageOperatorDiffAbsCol
@@ -46,6 +43,9 @@ from PIL import Image, ImageTk
 
 g_status = None
 
+# presets are stored next to the script
+g_preset_dir = f"{os.path.dirname(os.path.abspath(__file__))}/preset"
+
 
 
 
@@ -142,18 +142,6 @@ class ImageTab(ttk.Frame):
 
     param_scalestep = 1.3
 
-    current_scale = 1.0
-    current_xoffset = 0
-    current_yoffset = 0
-
-    scaled_image_xsize = 0
-    scaled_image_ysize = 0
-    scaled_image_xoffset = 0
-    scaled_image_yoffset = 0
-
-    visible_scaled_image_region = (0,0,1,1)
-    visible_orig_image_region = (0,0,1,1)
-
     '''
     ' constructor
     '''
@@ -168,11 +156,30 @@ class ImageTab(ttk.Frame):
         self.canvas = tk.Canvas(self.master, highlightthickness=0)
         self.canvas.grid(row=0, column=0, sticky='nswe')
         self.canvas.update()  # wait till canvas is created
+        # one canvas image item is moved and refilled by every redraw
+        self.imageid = self.canvas.create_image(0, 0, anchor='nw')
+        self.canvas.imagetk = None
 
         # Make the canvas expandable
         self.master.rowconfigure(0, weight=1)
         self.master.columnconfigure(0, weight=1)
 
+        # zoom and pan state of this tab
+        self.current_scale = 1.0
+        self.current_xoffset = 0
+        self.current_yoffset = 0
+
+        # scaled image and visible regions of the last redraw
+        self.scaled_image_xsize = 0
+        self.scaled_image_ysize = 0
+        self.scaled_image_xoffset = 0
+        self.scaled_image_yoffset = 0
+        self.scaled_image_region = (0,0,1,1)
+        self.visible_scaled_image_region = (0,0,1,1)
+        self.visible_orig_image_region = (0,0,1,1)
+        # canvas size, scale and offsets the visible image was drawn with
+        self.redraw_state = None
+
         # image values
         self.img = himage
         self.img_xoffset = 0
@@ -180,6 +187,25 @@ class ImageTab(ttk.Frame):
         self.img_xsize = himage.image_info.get_width()
         self.img_ysize = himage.image_info.get_height()
 
+        # mouse moves and wheel steps are collected and redrawn once when tk gets idle
+        self.pending_xoffset = 0
+        self.pending_yoffset = 0
+        self.pending_scale_factor = 1.0
+        self.pending_event = None
+        self.redraw_pending = False
+
+        # the image part of the status line is fixed, the position part is only updated when the image pixel changes
+        image_info = himage.image_info
+        self.status_prefix = ( f"Image: [{image_info.get_width()}x{image_info.get_height()}] - " +
+                               f"Mode: [{image_info.get_colormode()} {image_info.get_bitdepth()}bit] - " )
+        self.status_pos = None
+        # hex digits of the color values including the '0x' prefix
+        self.status_color_spec = f"#0{2 + (image_info.get_bitdepth() + 3) // 4}x"
+
+        # ratio of original image pixels per canvas pixel, updated by every redraw
+        self.pointer_xscale = 0.0
+        self.pointer_yscale = 0.0
+
         # Bind events to the Canvas
         self.canvas.bind("<Visibility>",        self.__redraw)
         self.canvas.bind('<Configure>',         self.__redraw     )   # canvas is resized
@@ -190,6 +216,7 @@ class ImageTab(ttk.Frame):
         self.canvas.bind('<Button-5>',          self.__wheel      )   # only with Linux, wheel scroll down
         self.canvas.bind('<Button-4>',          self.__wheel      )   # only with Linux, wheel scroll up
         self.canvas.bind('<Motion>',            self.__pointer    )
+        self.canvas.bind('<Leave>',             self.__pointer_leave )
         self.__redraw()
 
     '''
@@ -198,97 +225,127 @@ class ImageTab(ttk.Frame):
 
     def __pointer(self, event):
         global g_status
-        if (    event.x > ImageTab.visible_scaled_image_region[0] and
-                event.x < ImageTab.visible_scaled_image_region[2] and
-                event.y > ImageTab.visible_scaled_image_region[1] and
-                event.y < ImageTab.visible_scaled_image_region[3] ) :
-            xpos = int( ImageTab.visible_orig_image_region[0] + (event.x - ImageTab.visible_scaled_image_region[0]) / (ImageTab.visible_scaled_image_region[2] - ImageTab.visible_scaled_image_region[0]) * (ImageTab.visible_orig_image_region[2] - ImageTab.visible_orig_image_region[0]) )
-            ypos = int( ImageTab.visible_orig_image_region[1] + (event.y - ImageTab.visible_scaled_image_region[1]) / (ImageTab.visible_scaled_image_region[3] - ImageTab.visible_scaled_image_region[1]) * (ImageTab.visible_orig_image_region[3] - ImageTab.visible_orig_image_region[1]) )
-            xsize = self.img.image_info.get_width()
-            ysize = self.img.image_info.get_height()
-            size_digits = 3
-            mode = self.img.image_info.get_colormode()
-            bitdepth = self.img.image_info.get_bitdepth()
-            bitdepth_digits = 2 + (bitdepth + 3) // 4
+        if (    event.x > self.visible_scaled_image_region[0] and
+                event.x < self.visible_scaled_image_region[2] and
+                event.y > self.visible_scaled_image_region[1] and
+                event.y < self.visible_scaled_image_region[3] ) :
+            xpos = int( self.visible_orig_image_region[0] + (event.x - self.visible_scaled_image_region[0]) * self.pointer_xscale )
+            ypos = int( self.visible_orig_image_region[1] + (event.y - self.visible_scaled_image_region[1]) * self.pointer_yscale )
+            if (xpos, ypos) == self.status_pos:
+                # still the same image pixel, the status is up to date
+                return
             colors = self.img.get_pixel(xpos, ypos)
             if colors:
-                g_status.set(   f"Image: [{xsize}x{ysize}] - " + 
-                                f"Mode: [{mode} {bitdepth}bit] - " + 
-                                f"Position: [" + "{0:#{1}}".format(xpos, size_digits) + "x" + "{0:#{1}}".format(ypos, size_digits) + "] - "
-                                f"Color: [" + ", ".join("{0:#0{1}x}".format(num, bitdepth_digits) for num in colors) + "]"
+                self.status_pos = (xpos, ypos)
+                g_status.set(   self.status_prefix +
+                                f"Position: [{xpos:#3}x{ypos:#3}] - " +
+                                f"Color: [" + ", ".join(format(num, self.status_color_spec) for num in colors) + "]"
                             )
 
+    def __pointer_leave(self, event):
+        # the status may be overwritten by other tabs until the pointer is back
+        self.status_pos = None
+
 
     def __move_from(self, event):
         self.move_from_x = event.x
         self.move_from_y = event.y
 
     def __move(self, event):
-        delta_xoffset = event.x - self.move_from_x
-        delta_yoffset = event.y - self.move_from_y
+        self.pending_xoffset += event.x - self.move_from_x
+        self.pending_yoffset += event.y - self.move_from_y
         self.move_from_x = event.x
         self.move_from_y = event.y
-        self.__redraw(event=event, delta_xoffset=delta_xoffset, delta_yoffset=delta_yoffset)
+        self.__schedule_redraw()
 
     def __wheel(self, event):
         # Respond to Linux (event.num) or Windows (event.delta) wheel event
-        delta_scale = 0
         if event.num == 5 or event.delta == -120:  # scroll down
-            delta_scale = ImageTab.current_scale * ImageTab.param_scalestep - ImageTab.current_scale
+            self.pending_scale_factor *= ImageTab.param_scalestep
         if event.num == 4 or event.delta == 120:  # scroll up
-            delta_scale = ImageTab.current_scale - ImageTab.current_scale * ImageTab.param_scalestep
-        self.__redraw(event=event, delta_scale=delta_scale)
+            self.pending_scale_factor *= 2 - ImageTab.param_scalestep
+        # the scaling center follows the last wheel position
+        self.pending_event = event
+        self.__schedule_redraw()
+
+    def __schedule_redraw(self):
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.canvas.after_idle(self.__pending_redraw)
+
+    def __pending_redraw(self):
+        # apply all moves and wheel steps collected since the last redraw at once
+        delta_xoffset = self.pending_xoffset
+        delta_yoffset = self.pending_yoffset
+        delta_scale = self.current_scale * self.pending_scale_factor - self.current_scale
+        event = self.pending_event
+        self.pending_xoffset = 0
+        self.pending_yoffset = 0
+        self.pending_scale_factor = 1.0
+        self.pending_event = None
+        self.redraw_pending = False
+        self.__redraw(event=event, delta_scale=delta_scale, delta_xoffset=delta_xoffset, delta_yoffset=delta_yoffset)
 
     def __reset(self, event=None):
-        ImageTab.current_scale = 1.0
-        ImageTab.current_xoffset = 0
-        ImageTab.current_yoffset = 0
+        self.current_scale = 1.0
+        self.current_xoffset = 0
+        self.current_yoffset = 0
         self.__redraw()
 
     def __redraw(self, event=None, delta_scale=None, delta_xoffset=None, delta_yoffset=None):
-        print( f"redraw image " )
-        print( f"event {event}" )
+        # the redraw runs on every mouse event, only format the debug output when it is logged
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+        if debug:
+            logging.debug( f"redraw image " )
+            logging.debug( f"event {event}" )
 
         # visible canvas region
         canvas_xsize = self.canvas.winfo_width()
         canvas_ysize = self.canvas.winfo_height()
         canvas_region= ( 0, 0, canvas_xsize + 1, canvas_ysize + 1)
-        print( f"canvas                     :  {0},{0} {canvas_xsize}x{canvas_ysize} - {canvas_region}" )
+        if debug:
+            logging.debug( f"canvas                     :  {0},{0} {canvas_xsize}x{canvas_ysize} - {canvas_region}" )
 
         # apply delta values before calculating the image to display on the canvas
         if delta_xoffset:
-            ImageTab.current_xoffset += delta_xoffset
+            self.current_xoffset += delta_xoffset
         if delta_yoffset:
-            ImageTab.current_yoffset += delta_yoffset
+            self.current_yoffset += delta_yoffset
         if delta_scale:
-            ImageTab.current_scale += delta_scale
+            self.current_scale += delta_scale
+
+        # nothing to do for events that change neither the canvas size nor the zoom and pan state
+        redraw_state = (canvas_xsize, canvas_ysize, self.current_scale, self.current_xoffset, self.current_yoffset)
+        if redraw_state == self.redraw_state:
+            return
 
         #scaled image size, offsest and region
-        scaled_image_xsize = int(self.img_xsize * ImageTab.current_scale )
-        scaled_image_ysize = int(self.img_ysize * ImageTab.current_scale )
-        scaled_image_xoffset = int((canvas_xsize - scaled_image_xsize) / 2) + ImageTab.current_xoffset
-        scaled_image_yoffset = int((canvas_ysize - scaled_image_ysize) / 2) + ImageTab.current_yoffset
+        scaled_image_xsize = int(self.img_xsize * self.current_scale )
+        scaled_image_ysize = int(self.img_ysize * self.current_scale )
+        scaled_image_xoffset = int((canvas_xsize - scaled_image_xsize) / 2) + self.current_xoffset
+        scaled_image_yoffset = int((canvas_ysize - scaled_image_ysize) / 2) + self.current_yoffset
 
         # adjust the scaling center when the mouse pointer is within the visible image size
         if event and delta_scale:
-            if (    event.x > ImageTab.visible_scaled_image_region[0] and
-                    event.x < ImageTab.visible_scaled_image_region[2] and
-                    event.y > ImageTab.visible_scaled_image_region[1] and
-                    event.y < ImageTab.visible_scaled_image_region[3] ) :
-                offset_adjust_x = int(event.x - scaled_image_xoffset - ((event.x - ImageTab.scaled_image_xoffset) / ImageTab.scaled_image_xsize) * scaled_image_xsize)
-                offset_adjust_y = int(event.y - scaled_image_yoffset - ((event.y - ImageTab.scaled_image_yoffset) / ImageTab.scaled_image_ysize) * scaled_image_ysize)
+            if (    event.x > self.visible_scaled_image_region[0] and
+                    event.x < self.visible_scaled_image_region[2] and
+                    event.y > self.visible_scaled_image_region[1] and
+                    event.y < self.visible_scaled_image_region[3] ) :
+                offset_adjust_x = int(event.x - scaled_image_xoffset - ((event.x - self.scaled_image_xoffset) / self.scaled_image_xsize) * scaled_image_xsize)
+                offset_adjust_y = int(event.y - scaled_image_yoffset - ((event.y - self.scaled_image_yoffset) / self.scaled_image_ysize) * scaled_image_ysize)
                 scaled_image_xoffset += offset_adjust_x
                 scaled_image_yoffset += offset_adjust_y
-                ImageTab.current_xoffset += offset_adjust_x
-                ImageTab.current_yoffset += offset_adjust_y
+                self.current_xoffset += offset_adjust_x
+                self.current_yoffset += offset_adjust_y
 
-        ImageTab.scaled_image_xsize = scaled_image_xsize
-        ImageTab.scaled_image_ysize = scaled_image_ysize
-        ImageTab.scaled_image_xoffset = scaled_image_xoffset
-        ImageTab.scaled_image_yoffset = scaled_image_yoffset
+        self.scaled_image_xsize = scaled_image_xsize
+        self.scaled_image_ysize = scaled_image_ysize
+        self.scaled_image_xoffset = scaled_image_xoffset
+        self.scaled_image_yoffset = scaled_image_yoffset
         scaled_image_region =  (scaled_image_xoffset, scaled_image_yoffset, scaled_image_xsize + scaled_image_xoffset + 1, scaled_image_ysize + scaled_image_yoffset + 1 )
-        ImageTab.scaled_image_region = scaled_image_region
-        print( f"scaled_image_region        :  {scaled_image_xoffset},{scaled_image_yoffset} {scaled_image_xsize}x{scaled_image_ysize} - {scaled_image_region}" )
+        self.scaled_image_region = scaled_image_region
+        if debug:
+            logging.debug( f"scaled_image_region        :  {scaled_image_xoffset},{scaled_image_yoffset} {scaled_image_xsize}x{scaled_image_ysize} - {scaled_image_region}" )
 
         #visible scaled image area on canvas
         visible_scaled_image_region = ( min( max( canvas_region[0], scaled_image_region[0] ), canvas_region[2] ), 
@@ -299,38 +356,57 @@ class ImageTab(ttk.Frame):
         visible_scaled_image_ysize = visible_scaled_image_region[3] - visible_scaled_image_region[1] - 1 
         visible_scaled_image_xoffset = visible_scaled_image_region[0]
         visible_scaled_image_yoffset = visible_scaled_image_region[1]
-        ImageTab.visible_scaled_image_region = visible_scaled_image_region
-        print( f"visible_scaled_image_region:  {visible_scaled_image_xoffset},{visible_scaled_image_yoffset} {visible_scaled_image_xsize}x{visible_scaled_image_ysize} - {visible_scaled_image_region}" )
+        self.visible_scaled_image_region = visible_scaled_image_region
+        if debug:
+            logging.debug( f"visible_scaled_image_region:  {visible_scaled_image_xoffset},{visible_scaled_image_yoffset} {visible_scaled_image_xsize}x{visible_scaled_image_ysize} - {visible_scaled_image_region}" )
 
         # visible original image region
         if visible_scaled_image_xoffset > 0 :
             visible_orig_image_xoffset = 0
         else :
-            visible_orig_image_xoffset = int( -scaled_image_xoffset / ImageTab.current_scale )
+            visible_orig_image_xoffset = int( -scaled_image_xoffset / self.current_scale )
 
         if visible_scaled_image_yoffset > 0 :
             visible_orig_image_yoffset = 0
         else :
-            visible_orig_image_yoffset = int( -scaled_image_yoffset / ImageTab.current_scale )
+            visible_orig_image_yoffset = int( -scaled_image_yoffset / self.current_scale )
 
-        visible_orig_image_xsize = int(visible_scaled_image_xsize / ImageTab.current_scale )
-        visible_orig_image_ysize = int(visible_scaled_image_ysize / ImageTab.current_scale )
+        visible_orig_image_xsize = int(visible_scaled_image_xsize / self.current_scale )
+        visible_orig_image_ysize = int(visible_scaled_image_ysize / self.current_scale )
 
         visible_orig_image_region = (   visible_orig_image_xoffset, 
                                         visible_orig_image_yoffset, 
                                         visible_orig_image_xoffset + visible_orig_image_xsize + 1, 
                                         visible_orig_image_yoffset + visible_orig_image_ysize + 1)
 
-        ImageTab.visible_orig_image_region = visible_orig_image_region
-        print( f"visible_orig_image_region  :  {visible_orig_image_xoffset},{visible_orig_image_yoffset} {visible_orig_image_xsize}x{visible_orig_image_ysize} - {visible_orig_image_region}" )
+        self.visible_orig_image_region = visible_orig_image_region
+
+        # ratio of the visible original to the visible scaled image used by the pointer
+        if visible_scaled_image_region[2] > visible_scaled_image_region[0] and visible_scaled_image_region[3] > visible_scaled_image_region[1]:
+            self.pointer_xscale = (visible_orig_image_region[2] - visible_orig_image_region[0]) / (visible_scaled_image_region[2] - visible_scaled_image_region[0])
+            self.pointer_yscale = (visible_orig_image_region[3] - visible_orig_image_region[1]) / (visible_scaled_image_region[3] - visible_scaled_image_region[1])
+        if debug:
+            logging.debug( f"visible_orig_image_region  :  {visible_orig_image_xoffset},{visible_orig_image_yoffset} {visible_orig_image_xsize}x{visible_orig_image_ysize} - {visible_orig_image_region}" )
 
         if visible_scaled_image_xsize > 0  and visible_scaled_image_ysize > 0:
             image = self.img.get_image()
             image = image.crop( visible_orig_image_region).resize( (visible_scaled_image_xsize, visible_scaled_image_ysize), resample=Image.NEAREST)
-            imagetk = ImageTk.PhotoImage(image)
-            imageid = self.canvas.create_image( visible_scaled_image_xoffset, visible_scaled_image_yoffset, anchor='nw', image=imagetk)
+            imagetk = self.canvas.imagetk
+            if imagetk is not None and imagetk.width() == image.width and imagetk.height() == image.height:
+                # the visible size did not change, refill the shown tk photo instead of creating a new one
+                imagetk.paste(image)
+            else:
+                imagetk = ImageTk.PhotoImage(image)
+                self.canvas.itemconfig(self.imageid, image=imagetk)
+                self.canvas.imagetk = imagetk  # keep an extra reference to prevent garbage-collection
+            self.canvas.coords(self.imageid, visible_scaled_image_xoffset, visible_scaled_image_yoffset)
+        else:
+            # the image is moved out of the visible canvas
+            self.canvas.itemconfig(self.imageid, image='')
+            self.canvas.imagetk = None
 
-            self.canvas.imagetk = imagetk  # keep an extra reference to prevent garbage-collection
+        # the zoom center adjustment above may have moved the offsets after the check
+        self.redraw_state = (canvas_xsize, canvas_ysize, self.current_scale, self.current_xoffset, self.current_yoffset)
 
 
 
@@ -542,9 +618,10 @@ class HIMView(tkdnd.Tk):
             image_colormode_var.set( imageinfo.get_value(param) )
 
         def imageinfo_update():
-            imageinfo.set_bitdepth(image_bitdepth_var.get())
-            imageinfo.set_size(image_xsize_var.get(), image_ysize_var.get())
-            imageinfo.set_colormode(image_colormode_var.get())
+            with imageinfo.batch_update():
+                imageinfo.set_bitdepth(image_bitdepth_var.get())
+                imageinfo.set_size(image_xsize_var.get(), image_ysize_var.get())
+                imageinfo.set_colormode(image_colormode_var.get())
 
 
         fr_st = ttk.Frame(fr, relief=tk.RAISED, borderwidth=1)
@@ -619,10 +696,11 @@ class HIMView(tkdnd.Tk):
 
         def storageinfo_update():
             # update the imageinfo and storage info references
-            storageinfo.set_storagemode(storage_mode_var.get())
-            storageinfo.set_storageformat(storage_format_var.get())
-            storageinfo.set_alignment(storage_alignment_var.get())
-            storageinfo.set_endianess(storage_endianess_var.get())
+            with storageinfo.batch_update():
+                storageinfo.set_storagemode(storage_mode_var.get())
+                storageinfo.set_storageformat(storage_format_var.get())
+                storageinfo.set_alignment(storage_alignment_var.get())
+                storageinfo.set_endianess(storage_endianess_var.get())
 
 
         fr_pre = ttk.Frame(fr, relief=tk.RAISED, borderwidth=1)
@@ -635,28 +713,26 @@ class HIMView(tkdnd.Tk):
 
         def fetch_preset():
             presets = []
-            preset_files = glob.glob(f"{os.path.dirname(os.path.abspath(__file__))}/preset/*.json")
-            for p in preset_files:
-                p = re.sub(r"/.*/", "", p)
-                p = re.sub(r"\.json", "", p)
-                presets.append(p)
+            if os.path.isdir(g_preset_dir):
+                with os.scandir(g_preset_dir) as preset_entries:
+                    presets = [ os.path.splitext(p.name)[0] for p in preset_entries if p.name.endswith(".json") ]
             pre_load_cmb.config(values=presets)
 
         def button_save_preset():
             preset_name = pre_save_var.get()
             if preset_name and not preset_name.isspace():
-                preset_filename = f"{os.path.dirname(os.path.abspath(__file__))}/preset/{preset_name}.json"
+                preset_filename = f"{g_preset_dir}/{preset_name}.json"
                 if not os.path.isfile(preset_filename) or messagebox.askokcancel(title="Save Preset", message=f"Overwrite existing preset '{preset_name}'?"):
                     with open(preset_filename, 'w') as preset_file:
 
                         imageinfo_update()
-                        preset_imageinfo = copy.deepcopy(imageinfo)
+                        preset_imageinfo = imageinfo.clone()
                         _, preset_imageinfo_params = preset_imageinfo.get_params()
                         for p in preset_imageinfo_params.values():
                             del p["editable"]
 
                         storageinfo_update()
-                        preset_storageinfo = copy.deepcopy(storageinfo)
+                        preset_storageinfo = storageinfo.clone()
                         _, preset_storageinfo_params = preset_storageinfo.get_params()
                         for p in preset_storageinfo_params.values():
                             del p["editable"]
@@ -664,21 +740,20 @@ class HIMView(tkdnd.Tk):
                         preset_content = {}
                         preset_content["imageinfo"] = preset_imageinfo_params
                         preset_content["storageinfo"] = preset_storageinfo_params
-                        preset_json_string = json.dumps(preset_content, indent=4)
-                        preset_file.write(preset_json_string)
+                        json.dump(preset_content, preset_file, indent=4)
                         fetch_preset()
 
         def button_load_preset():
             preset_name = pre_load_var.get()
-            preset_filename = f"{os.path.dirname(os.path.abspath(__file__))}/preset/{preset_name}.json"
+            preset_filename = f"{g_preset_dir}/{preset_name}.json"
             if os.path.isfile(preset_filename):
                 with open(preset_filename) as preset_file:
                     params = json.load(preset_file)
-                    imageinfo.apply_params(params["imageinfo"])
-                    storageinfo.apply_params(params["storageinfo"])
-                    image_value_set()
-                    storage_value_set()
-                    #self.apply_params(self, params)
+                imageinfo.apply_params(params["imageinfo"])
+                storageinfo.apply_params(params["storageinfo"])
+                image_value_set()
+                storage_value_set()
+                #self.apply_params(self, params)
 
         pre_load_frame = ttk.Frame(fr_pre)
         pre_load_frame.pack(fill=tk.X, anchor=tk.N)
@@ -742,6 +817,8 @@ class HIMView(tkdnd.Tk):
         tab_ids = self.tab_control.tabs()
         tab_names = []
         tab_vars = []
+        # images of the tabs by their listed names, looked up once when the dialog is built
+        tab_images = {}
 
         res_images = None
 
@@ -782,10 +859,10 @@ class HIMView(tkdnd.Tk):
                 for i in range(tab_count):
                     tab_content = self.tab_control.nametowidget(tab_ids[i]).nametowidget("!imagetab")
                     tab_names.append( f"Tab {i+1} - {tab_content.name}" )
+                    tab_images[tab_names[-1]] = tab_content.img
 
                 for i in range(select_count):
-                    tab_var = tk.StringVar('')
-                    tab_var.set( tab_names[tab_selected] )
+                    tab_var = tk.StringVar(d, value=tab_names[tab_selected])
                     tab_vars.append( tab_var )
                     fr_line = ttk.Frame(fr_sec)
                     fr_line.pack(fill=tk.X, anchor=tk.N)
@@ -807,10 +884,7 @@ class HIMView(tkdnd.Tk):
                 if tab_count > 0:
                     res_images = []
                     for i in range(select_count):
-                        tab_name = tab_vars[i].get()
-                        tab_index = tab_names.index(tab_name)
-                        tab_content = self.tab_control.nametowidget(tab_ids[tab_index]).nametowidget("!imagetab")
-                        res_images.append(tab_content.img)
+                        res_images.append(tab_images[tab_vars[i].get()])
             d.destroy()
             d.update()
 
@@ -831,52 +905,29 @@ class HIMView(tkdnd.Tk):
         return res_images
 
 
-    def dialog_abs_diff_col(self):
-        name = HImageOperatorDiffAbsCol.get_name()
-        description = HImageOperatorDiffAbsCol.get_description()
-        input_count = HImageOperatorDiffAbsCol.get_input_count()
-        images = self.dialog_tab_select_generic(select_count=input_count, name=name, description=description)
-        if images and len(images) == input_count:
-            ok, tab_image, _ = HImageOperatorDiffAbsCol.execute(images)
-            tab_name = "Absolute Difference (color)"
+    def dialog_operator(self, operator, tab_name):
+        # the select dialog returns either None or one image per input
+        images = self.dialog_tab_select_generic(select_count=operator.get_input_count(), name=operator.get_name(), description=operator.get_description())
+        if images:
+            ok, tab_image, _ = operator.execute(images)
             if ok:
                 self.open_image_tab(tab_image, tab_name)
 
 
+    def dialog_abs_diff_col(self):
+        self.dialog_operator(HImageOperatorDiffAbsCol, "Absolute Difference (color)")
+
+
     def dialog_abs_diff_grey(self):
-        name = HImageOperatorDiffAbsAll.get_name()
-        description = HImageOperatorDiffAbsAll.get_description()
-        input_count = HImageOperatorDiffAbsAll.get_input_count()
-        images = self.dialog_tab_select_generic(select_count=input_count, name=name, description=description)
-        if images and len(images) == input_count:
-            ok, tab_image, _ = HImageOperatorDiffAbsAll.execute(images)
-            tab_name = "Absolute Difference (mono)"
-            if ok:
-                self.open_image_tab(tab_image, tab_name)
+        self.dialog_operator(HImageOperatorDiffAbsAll, "Absolute Difference (mono)")
 
 
     def dialog_rel_diff_col(self):
-        name = HImageOperatorDiffRelCol.get_name()
-        description = HImageOperatorDiffRelCol.get_description()
-        input_count = HImageOperatorDiffRelCol.get_input_count()
-        images = self.dialog_tab_select_generic(select_count=input_count, name=name, description=description)
-        if images and len(images) == input_count:
-            ok, tab_image, _ = HImageOperatorDiffRelCol.execute(images)
-            tab_name = "Relative Difference (color)"
-            if ok:
-                self.open_image_tab(tab_image, tab_name)
+        self.dialog_operator(HImageOperatorDiffRelCol, "Relative Difference (color)")
 
 
     def dialog_rel_diff_grey(self):
-        name = HImageOperatorDiffRelAll.get_name()
-        description = HImageOperatorDiffRelAll.get_description()
-        input_count = HImageOperatorDiffRelAll.get_input_count()
-        images = self.dialog_tab_select_generic(select_count=input_count, name=name, description=description)
-        if images and len(images) == input_count:
-            ok, tab_image, _ = HImageOperatorDiffRelAll.execute(images)
-            tab_name = "Relative Difference (mono)"
-            if ok:
-                self.open_image_tab(tab_image, tab_name)
+        self.dialog_operator(HImageOperatorDiffRelAll, "Relative Difference (mono)")
 
 
     def dialog_not_implemented(self):
@@ -884,10 +935,13 @@ class HIMView(tkdnd.Tk):
 
 
     def dialog_file_open(self, filename):
+        # a cancelled file dialog returns an empty name
+        if not filename:
+            return
         tab_image = HImage()
         ok = tab_image.open(file_name=filename, config_function=self.dialog_configure_image)
         if ok:
-            tab_name = re.findall("([/].*[/])(.*)$", f"//{filename}")[0][1]
+            tab_name = os.path.basename(filename)
             self.open_image_tab(tab_image, tab_name)
 
     def dialog_file_open_ask(self):
@@ -905,6 +959,8 @@ if __name__ == '__main__':
     arg_nosplash = False
     arg_files = []
 
+    # relative file arguments are relative to the working directory of the call
+    cwd = os.getcwd()
     for arg in sys.argv:
         if arg == __file__:
             pass
@@ -913,13 +969,13 @@ if __name__ == '__main__':
         else:
             filename = arg
             if not os.path.isabs(filename):
-                filename = f"{os.getcwd()}/{filename}"
+                filename = os.path.join(cwd, filename)
             if os.path.isfile(filename):
                 arg_files.append(filename)
 
     him_view = HIMView(nosplash=arg_nosplash)
 
     for f in arg_files:
-        him_view.open_image_tab(HImage(f), re.findall("([/].*[/])(.*)$", f"//{f}")[0][1])
+        him_view.dialog_file_open(f)
 
     him_view.mainloop()
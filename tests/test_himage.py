@@ -0,0 +1,258 @@
+import numpy as np
+import pytest
+
+from himage import HImage, HImageInfo, HImageStorageInfo
+from himage import HImageOperatorDiffAbsCol, HImageOperatorDiffAbsAll, HImageOperatorDiffRelCol, HImageOperatorDiffRelAll
+
+
+
+##########################################################################################
+#
+# helpers
+#
+##########################################################################################
+
+@pytest.fixture
+def data_dir(tmp_path_factory):
+    # the raw reader parses the whole path, the per test tmp_path would add the test parameters to it
+    return tmp_path_factory.mktemp("data")
+
+
+def config(storage_params=None, image_params=None):
+    # config_function for HImage.open applying fixed storage and image params, the colormodes follow the storage mode
+    def config_function(storageinfo, imageinfo):
+        for param, value in (storage_params or {}).items():
+            storageinfo.set_value(param, value)
+            if param == HImageStorageInfo.PARAM_STORAGEMODE:
+                imageinfo.set_colormode_from_storagemode(value)
+        for param, value in (image_params or {}).items():
+            imageinfo.set_value(param, value)
+        return storageinfo.validate_params() and imageinfo.validate_params(), storageinfo, imageinfo
+    return config_function
+
+
+def open_image(file_name, storage_params=None, image_params=None):
+    image = HImage()
+    ok = image.open(file_name=str(file_name), config_function=config(storage_params, image_params))
+    return ok, image
+
+
+def pixels(image, component=-1):
+    # all pixel values of one component as (h, w) array, read through get_pixel
+    width, height = image.get_imageinfo().get_size()
+    return np.array([[image.get_pixel(x, y, component)[0] for x in range(width)] for y in range(height)])
+
+
+def pack_mipi10(values):
+    groups = np.resize(values, -(-len(values) // 4) * 4).reshape(-1, 4)
+    packed = np.empty((len(groups), 5), dtype=np.uint8)
+    packed[:, :4] = groups >> 2
+    packed[:, 4] = sum((groups[:, i] & 0x03) << (2 * i) for i in range(4))
+    return packed
+
+
+def pack_mipi12(values):
+    groups = np.resize(values, -(-len(values) // 2) * 2).reshape(-1, 2)
+    packed = np.empty((len(groups), 3), dtype=np.uint8)
+    packed[:, :2] = groups >> 4
+    packed[:, 2] = (groups[:, 0] & 0x0f) | ((groups[:, 1] & 0x0f) << 4)
+    return packed
+
+
+def create_rgb(rng, width, height, bitdepth):
+    data_dtype = HImage.data_dtype(bitdepth)
+    bitshift = np.dtype(data_dtype).itemsize * 8 - bitdepth
+    values = rng.integers(0, 1 << bitdepth, (3, height, width), dtype=np.uint64)
+    image = HImage()
+    image_info = HImageInfo(colormode=HImageInfo.COLORMODE_RGB, width=width, height=height, bitdepth=bitdepth)
+    assert image.create(image_info=image_info, image_data=[(v << bitshift).astype(data_dtype) for v in values])
+    return image, values.astype(np.float64)
+
+
+
+##########################################################################################
+#
+# raw reader
+#
+##########################################################################################
+
+@pytest.mark.parametrize("storage_format, endianess, alignment, dtype, shift", [
+    (HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_ENDIANESS_LITTLE, HImageStorageInfo.STORAGE_ALIGNMENT_LSB, '<u2', 0),
+    (HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_ENDIANESS_BIG,    HImageStorageInfo.STORAGE_ALIGNMENT_LSB, '>u2', 0),
+    (HImageStorageInfo.STORAGE_FORMAT_16, HImageStorageInfo.STORAGE_ENDIANESS_LITTLE, HImageStorageInfo.STORAGE_ALIGNMENT_MSB, '<u2', 4),
+    (HImageStorageInfo.STORAGE_FORMAT_32, HImageStorageInfo.STORAGE_ENDIANESS_LITTLE, HImageStorageInfo.STORAGE_ALIGNMENT_LSB, '<u4', 0),
+])
+def test_raw_mono(data_dir, storage_format, endianess, alignment, dtype, shift):
+    values = np.random.default_rng(1).integers(0, 1 << 12, (5, 7))
+    file_name = data_dir / "mono_7x5_12b.raw"
+    (values << shift).astype(dtype).tofile(file_name)
+
+    ok, image = open_image(file_name, { HImageStorageInfo.PARAM_STORAGEFORMAT: storage_format,
+                                        HImageStorageInfo.PARAM_ENDIANESS: endianess,
+                                        HImageStorageInfo.PARAM_ALIGNMENT: alignment })
+    assert ok
+    assert np.array_equal(pixels(image), values)
+
+
+@pytest.mark.parametrize("width, height", [(4, 2), (3, 2), (3, 3), (5, 2)])
+@pytest.mark.parametrize("storage_format, bitdepth, pack", [
+    (HImageStorageInfo.STORAGE_FORMAT_MIPI_10, 10, pack_mipi10),
+    (HImageStorageInfo.STORAGE_FORMAT_MIPI_12, 12, pack_mipi12),
+])
+def test_raw_mipi(data_dir, width, height, storage_format, bitdepth, pack):
+    # sizes not filling the last packed group are stored with a whole group
+    values = np.random.default_rng(2).integers(0, 1 << bitdepth, width * height)
+    file_name = data_dir / f"cam_{width}x{height}_{bitdepth}b.dump"
+    pack(values).tofile(file_name)
+
+    ok, image = open_image(file_name, { HImageStorageInfo.PARAM_STORAGEFORMAT: storage_format })
+    assert ok
+    assert np.array_equal(pixels(image), values.reshape(height, width))
+
+
+def test_raw_mipi_too_small(data_dir):
+    file_name = data_dir / "cam_3x3_10b.dump"
+    pack_mipi10(np.zeros(9, dtype=np.uint16)).ravel()[:-1].tofile(file_name)
+
+    ok, _ = open_image(file_name)
+    assert not ok
+
+
+@pytest.mark.parametrize("storage_mode", HImageStorageInfo.STORAGE_MODES_YUV422)
+def test_raw_yuv422(data_dir, storage_mode):
+    width, height = 6, 3
+    rng = np.random.default_rng(3)
+    y = rng.integers(0, 1 << 10, (height, width))
+    u = rng.integers(0, 1 << 10, (height, width // 2))
+    v = rng.integers(0, 1 << 10, (height, width // 2))
+    if storage_mode in HImageStorageInfo.STORAGE_MODES_PLANAR:
+        chroma = (u, v) if storage_mode == HImageStorageInfo.STORAGE_MODE_YUV422_YUV_planar else (v, u)
+        samples = np.concatenate([ y.ravel(), chroma[0].ravel(), chroma[1].ravel() ])
+    else:
+        y_offset, u_offset, v_offset = HImageStorageInfo.STORAGE_MODE_YUV422_OFFSETS[storage_mode]
+        samples = np.empty((height, width // 2, 4), dtype=np.int64)
+        samples[..., y_offset] = y[:, 0::2]
+        samples[..., y_offset + 2] = y[:, 1::2]
+        samples[..., u_offset] = u
+        samples[..., v_offset] = v
+    file_name = data_dir / f"img_{width}x{height}_10b_422.yuv"
+    samples.astype('<u2').tofile(file_name)
+
+    ok, image = open_image(file_name, { HImageStorageInfo.PARAM_STORAGEMODE: storage_mode,
+                                        HImageStorageInfo.PARAM_STORAGEFORMAT: HImageStorageInfo.STORAGE_FORMAT_16,
+                                        HImageStorageInfo.PARAM_ALIGNMENT: HImageStorageInfo.STORAGE_ALIGNMENT_LSB })
+    assert ok
+    assert np.array_equal(pixels(image, 0), y)
+    assert np.array_equal(pixels(image, 1), u.repeat(2, axis=1))
+    assert np.array_equal(pixels(image, 2), v.repeat(2, axis=1))
+
+
+@pytest.mark.parametrize("file_name, storage_params", [
+    ("img_5x2_10b_422.yuv", { HImageStorageInfo.PARAM_STORAGEMODE: HImageStorageInfo.STORAGE_MODE_YUV422_YUYV_interleaved }),
+    ("img_5x2_10b_422.yuv", { HImageStorageInfo.PARAM_STORAGEMODE: HImageStorageInfo.STORAGE_MODE_YUV422_YUV_planar }),
+    ("img_4x2_10b.raw",     { HImageStorageInfo.PARAM_STORAGEMODE: HImageStorageInfo.STORAGE_MODE_RGB_RGB_interleaved,
+                              HImageStorageInfo.PARAM_STORAGEFORMAT: HImageStorageInfo.STORAGE_FORMAT_MIPI_10 }),
+])
+def test_raw_geometry_rejected(data_dir, file_name, storage_params):
+    # geometries the storage layout can not hold fail the open instead of raising
+    np.zeros(1024, dtype=np.uint8).tofile(data_dir / file_name)
+
+    ok, _ = open_image(data_dir / file_name, storage_params)
+    assert not ok
+
+
+@pytest.mark.parametrize("colormode, offsets", [
+    (HImageInfo.COLORMODE_BAYER_RGGB, ((0, 0), (1, 1))),
+    (HImageInfo.COLORMODE_BAYER_GBRG, ((1, 0), (0, 1))),
+    (HImageInfo.COLORMODE_BAYER_BGGR, ((1, 1), (0, 0))),
+    (HImageInfo.COLORMODE_BAYER_GRBG, ((0, 1), (1, 0))),
+])
+def test_raw_bayer(data_dir, colormode, offsets):
+    width, height = 8, 4
+    values = np.random.default_rng(4).integers(0, 1 << 10, (height, width))
+    file_name = data_dir / f"cam_{width}x{height}_10b.raw"
+    values.astype('<u2').tofile(file_name)
+
+    ok, image = open_image(file_name, { HImageStorageInfo.PARAM_STORAGEMODE: HImageStorageInfo.STORAGE_MODE_MONO,
+                                        HImageStorageInfo.PARAM_STORAGEFORMAT: HImageStorageInfo.STORAGE_FORMAT_16,
+                                        HImageStorageInfo.PARAM_ALIGNMENT: HImageStorageInfo.STORAGE_ALIGNMENT_LSB },
+                                      { HImageInfo.PARAM_COLORMODE: colormode })
+    assert ok
+    assert np.array_equal(pixels(image), values)
+
+    # the display image repeats red and blue over their bayer cell, reduced to 8 bit
+    display = np.asarray(image.get_image())
+    assert display.shape == (height, width, 3)
+    (red_y, red_x), (blue_y, blue_x) = offsets
+    assert np.array_equal(display[..., 0], (values[red_y::2, red_x::2] >> 2).repeat(2, axis=0).repeat(2, axis=1))
+    assert np.array_equal(display[..., 2], (values[blue_y::2, blue_x::2] >> 2).repeat(2, axis=0).repeat(2, axis=1))
+
+
+
+##########################################################################################
+#
+# diff operators
+#
+##########################################################################################
+
+def rel_reference(diff, diff_max):
+    # the relative difference scaled around the middle of the 32 bit range
+    scale = (2**31 - 2**10) / diff_max if diff_max else 1
+    return np.floor(diff * scale + 2**31)
+
+
+def result_data(image):
+    # the result components widened back to the msb aligned 32 bit range
+    data = np.stack(image.get_imagedata()).astype(np.float64)
+    return data * 2**(32 - image.get_imagedata()[0].dtype.itemsize * 8)
+
+
+@pytest.mark.parametrize("bitdepth", [10, 28])
+def test_diff_abs(bitdepth):
+    rng = np.random.default_rng(5)
+    image_a, values_a = create_rgb(rng, 6, 4, bitdepth)
+    image_b, values_b = create_rgb(rng, 6, 4, bitdepth)
+    diff = np.abs(values_a - values_b)
+
+    ok, image, _ = HImageOperatorDiffAbsCol.execute([image_a, image_b])
+    assert ok
+    assert np.array_equal(np.stack([pixels(image, c) for c in range(3)]), diff)
+
+    ok, image, _ = HImageOperatorDiffAbsAll.execute([image_a, image_b])
+    assert ok
+    assert np.array_equal(pixels(image), diff.max(axis=0))
+
+
+@pytest.mark.parametrize("bitdepth", [10, 28])
+def test_diff_rel(bitdepth):
+    rng = np.random.default_rng(6)
+    image_a, values_a = create_rgb(rng, 6, 4, bitdepth)
+    image_b, values_b = create_rgb(rng, 6, 4, bitdepth)
+    diff = values_a - values_b
+    diff_max = np.abs(diff).max()
+    # results narrower than 32 bit only keep the upper bits of the reference
+    def narrowed(reference, image):
+        step = 2**(32 - image.get_imagedata()[0].dtype.itemsize * 8)
+        return np.floor(reference / step) * step
+
+    ok, image, _ = HImageOperatorDiffRelCol.execute([image_a, image_b])
+    assert ok
+    assert np.array_equal(result_data(image), narrowed(rel_reference(diff, diff_max), image))
+
+    ok, image, _ = HImageOperatorDiffRelAll.execute([image_a, image_b])
+    assert ok
+    diff_index = np.abs(diff).argmax(axis=0)[np.newaxis]
+    reference = rel_reference(np.take_along_axis(diff, diff_index, axis=0), diff_max)
+    assert np.array_equal(result_data(image), narrowed(reference, image))
+
+
+def test_diff_rejects_mono():
+    image_info = HImageInfo(colormode=HImageInfo.COLORMODE_MONO, width=4, height=2, bitdepth=8)
+    images = []
+    for _ in range(2):
+        image = HImage()
+        assert image.create(image_info=image_info, image_data=[np.zeros((2, 4), dtype=np.uint8)])
+        images.append(image)
+
+    ok, _, _ = HImageOperatorDiffAbsCol.execute(images)
+    assert not ok